@@ -1,9 +1,18 @@
-import streamlit as st
+import os
 import re
+import streamlit as st
+
+from kitchen_sync import ALLERGEN_GROUPS, DEFAULT_CATALOG_PATH, TABS, Filters, IncrementalScorer, IngredientResolver, open_catalog, parse_fridge, parse_minutes, suggest_purchases
+from kitchen_sync.cards import card_html, make_card_fragments, swap_label, tag_html
+from kitchen_sync.perf import StageTimer, configure_log
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Kitchen Sync", layout="wide", page_icon="🔄")
 
+# --- PERFORMANCE TIMING ---
+# Off unless KITCHEN_SYNC_PERF is set or the sidebar "Performance" switch is on
+perf = StageTimer(bool(os.environ.get("KITCHEN_SYNC_PERF")) or st.session_state.get("perf_panel", False))
+
 # --- THEME MANAGEMENT ---
 with st.sidebar:
     st.title("🔄 Kitchen Sync")
@@ -12,54 +21,56 @@ with st.sidebar:
     dark_mode = st.toggle("🌙 Dark Mode", value=False)
 
 # --- CSS VARIABLES ---
-if dark_mode:
-    # DARK MODE
-    page_bg = "#0d1117"
-    sidebar_bg = "#161b22"
-    text_color = "#e6edf3"
-    sub_text = "#8b949e"
+# Each theme's <style> block is built (and minified) once per process, not on every rerun
+@st.cache_resource(show_spinner=False)
+def theme_css(dark_mode):
+    if dark_mode:
+        # DARK MODE
+        page_bg = "#0d1117"
+        sidebar_bg = "#161b22"
+        text_color = "#e6edf3"
+        sub_text = "#8b949e"
     
-    # Input (Forcing these colors)
-    input_bg = "#0d1117"
-    input_text = "#ffffff"
-    input_border = "1px solid #30363d"
-    color_scheme = "dark" 
+        # Input (Forcing these colors)
+        input_bg = "#0d1117"
+        input_text = "#ffffff"
+        input_border = "1px solid #30363d"
+        color_scheme = "dark" 
     
-    # Cards
-    card_bg = "#21262d"
-    card_border = "#30363d"
-    card_shadow = "0 4px 0 #30363d"
-    accent_color = "#7c3aed" # Purple
+        # Cards
+        card_bg = "#21262d"
+        card_border = "#30363d"
+        card_shadow = "0 4px 0 #30363d"
+        accent_color = "#7c3aed" # Purple
     
-    # Tabs
-    tab_bg = "rgba(255,255,255,0.05)"
-    tab_active = "#7c3aed"
-
-else:
-    # LIGHT MODE
-    page_bg = "#f8fafc"
-    sidebar_bg = "#ffffff"
-    text_color = "#1e293b"
-    sub_text = "#64748b"
+        # Tabs
+        tab_bg = "rgba(255,255,255,0.05)"
+        tab_active = "#7c3aed"
+
+    else:
+        # LIGHT MODE
+        page_bg = "#f8fafc"
+        sidebar_bg = "#ffffff"
+        text_color = "#1e293b"
+        sub_text = "#64748b"
     
-    # Input
-    input_bg = "#ffffff"
-    input_text = "#1e293b"
-    input_border = "1px solid #cbd5e1"
-    color_scheme = "light"
+        # Input
+        input_bg = "#ffffff"
+        input_text = "#1e293b"
+        input_border = "1px solid #cbd5e1"
+        color_scheme = "light"
     
-    # Cards
-    card_bg = "#ffffff"
-    card_border = "#e2e8f0"
-    card_shadow = "0 4px 0 #cbd5e1"
-    accent_color = "#0d9488" # Teal
+        # Cards
+        card_bg = "#ffffff"
+        card_border = "#e2e8f0"
+        card_shadow = "0 4px 0 #cbd5e1"
+        accent_color = "#0d9488" # Teal
     
-    # Tabs
-    tab_bg = "#f1f5f9"
-    tab_active = "#0d9488"
+        # Tabs
+        tab_bg = "#f1f5f9"
+        tab_active = "#0d9488"
 
-# --- INJECT CSS ---
-st.markdown(f"""
+    css = f"""
 <style>
     /* 1. FORCE BROWSER COLOR SCHEME */
     :root {{
@@ -188,219 +199,212 @@ st.markdown(f"""
     
     .streamlit-expanderHeader {{ background-color: transparent !important; border: none !important; }}
     [data-testid="stExpander"] {{ border: none !important; box-shadow: none !important; }}
+
+    /* 9. FAST CARDS (one HTML block per column, same look as the tiles) */
+    .recipe-card {{
+        background-color: {card_bg};
+        border: 1px solid {card_border};
+        border-left: 6px solid {accent_color};
+        border-radius: 16px;
+        padding: 24px;
+        box-shadow: {card_shadow};
+        margin-bottom: 16px;
+    }}
+    .card-progress {{ margin: 10px 0; font-size: 0.9rem; }}
+    .card-progress-track {{
+        background-color: rgba(150,150,150,0.2);
+        border-radius: 8px;
+        height: 8px;
+        margin-top: 4px;
+    }}
+    .card-progress-fill {{ background-color: {accent_color}; border-radius: 8px; height: 8px; }}
+    .card-ready {{
+        background-color: rgba(33,195,84,0.1);
+        border-radius: 8px;
+        padding: 10px 14px;
+        margin: 10px 0;
+    }}
+    .recipe-card summary {{ cursor: pointer; margin-top: 10px; }}
     
 </style>
-""", unsafe_allow_html=True)
+"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    return " ".join(css.split())
+
+# --- INJECT CSS ---
+st.markdown(theme_css(dark_mode), unsafe_allow_html=True)
+perf.lap("theme_css")
 
 
 # --- MAIN CONTENT ---
 st.title("Kitchen Sync")
 st.markdown("### 🍳 Everything but the... waste.")
 st.write("Enter the ingredients you already have at home, and we'll find the perfect recipe for you.")
+perf.lap("header")
 
 # --- LOGIC ---
-NON_VEGAN_ITEMS = {"eggs", "cheese", "butter", "milk", "chicken", "beef", "bacon", "tuna", "salmon", "shrimp", "honey", "cream cheese", "yogurt", "mayo", "ground beef", "parmesan", "mozzarella", "feta"}
-
-# --- THE RECIPE DATABASE ---
-recipes = [
-    # --- 1. EMPTY FRIDGE / PANTRY STAPLES ---
-    {"name": "Beans on Toast 🇬🇧", "ingredients": {"bread", "baked beans", "butter"}, "instructions": "Toast the bread. Microwave or heat beans on stove. Butter toast heavily. Pour beans over.", "time": "5 mins", "one_pot": True},
-    {"name": "Cheese Quesadilla 🧀", "ingredients": {"tortilla", "cheese", "butter"}, "instructions": "Melt butter in pan. Add tortilla. Sprinkle cheese. Fold in half. Cook until crispy and melted.", "time": "5 mins", "one_pot": True},
-    {"name": "Tuna Pasta 🐟", "ingredients": {"pasta", "tuna", "mayo", "corn", "black pepper"}, "instructions": "Boil pasta. Drain. Mix in canned tuna, mayo, and corn while hot. Season generously.", "time": "12 mins", "one_pot": True},
-    {"name": "Jacket Potato 🥔", "ingredients": {"potatoes", "butter", "cheese", "salt", "pepper"}, "instructions": "Prick potato. Microwave 5-8 mins until soft. Cut open, fluff inside, add butter and cheese.", "time": "10 mins", "one_pot": True},
-    {"name": "Cinnamon Sugar Toast 🍞", "ingredients": {"bread", "butter", "sugar", "cinnamon"}, "instructions": "Toast bread. Butter immediately. Sprinkle heavily with sugar and cinnamon mix.", "time": "3 mins", "one_pot": True},
-    {"name": "Peanut Butter & Banana 🍌", "ingredients": {"bread", "peanut butter", "banana"}, "instructions": "Toast bread. Spread peanut butter. Top with sliced banana. Optional: Drizzle honey.", "time": "3 mins", "one_pot": True},
-    {"name": "Buttered Sweet Corn 🌽", "ingredients": {"corn", "butter", "salt", "pepper"}, "instructions": "Boil or steam corn. Toss generously with butter, salt, and pepper.", "time": "10 mins", "one_pot": True},
-    {"name": "Cheesy Rice 🍚", "ingredients": {"rice", "cheese", "butter", "milk", "salt"}, "instructions": "Mix hot cooked rice with butter, milk, and cheese until melted and creamy.", "time": "20 mins", "one_pot": True},
-    {"name": "Egg in a Hole 🍞", "ingredients": {"bread", "eggs", "butter", "salt"}, "instructions": "Cut a hole in the bread. Fry bread in butter. Crack egg into the hole. Cook until set.", "time": "10 mins", "one_pot": True},
-    {"name": "Garlic Sautéed Mushrooms 🍄", "ingredients": {"mushrooms", "butter", "garlic", "soy sauce", "parsley"}, "instructions": "Sauté mushrooms in butter until browned. Add garlic and soy sauce. Cook 2 mins.", "time": "12 mins", "one_pot": True},
-    {"name": "Pasta Aglio e Olio 🍝", "ingredients": {"pasta", "olive oil", "garlic", "chili flakes", "parsley"}, "instructions": "Sauté garlic and chili in generous oil. Toss with cooked pasta and pasta water.", "time": "15 mins", "one_pot": False},
-    {"name": "Tomato & Onion Scramble 🍳", "ingredients": {"eggs", "tomato", "onion", "butter", "salt"}, "instructions": "Sauté onion and tomato in butter. Add beaten eggs and scramble until cooked.", "time": "10 mins", "one_pot": True},
-
-    # --- 2. VEGAN SPECIALS 🌱 ---
-    {"name": "Spicy Peanut Noodles 🍜", "ingredients": {"pasta", "peanut butter", "soy sauce", "garlic", "chili flakes", "lime"}, "instructions": "Boil pasta. Mix peanut butter, soy sauce, garlic, chili, lime, and a splash of pasta water. Toss.", "time": "15 mins", "one_pot": False},
-    {"name": "Lentil Soup 🥣", "ingredients": {"lentils", "carrots", "onion", "vegetable broth", "garlic", "spinach"}, "instructions": "Sauté veggies. Add lentils and broth. Simmer 20 mins until soft. Stir in spinach.", "time": "30 mins", "one_pot": True},
-    {"name": "Chickpea Smash Sandwich 🥪", "ingredients": {"chickpeas", "avocado", "lemon", "bread", "onion", "salt"}, "instructions": "Mash chickpeas and avocado together with lemon and onion. Spread on toasted bread.", "time": "10 mins", "one_pot": False},
-    {"name": "Black Bean Tacos 🌮", "ingredients": {"black beans", "corn", "tortilla", "avocado", "salsa", "lime"}, "instructions": "Warm beans and corn. Fill tortillas. Top with avocado slices, salsa, and lime juice.", "time": "15 mins", "one_pot": True},
-    {"name": "Roasted Veggie Bowl 🥗", "ingredients": {"sweet potato", "broccoli", "rice", "olive oil", "tahini", "lemon"}, "instructions": "Roast veggies at 400F. Serve over rice. Drizzle with tahini mixed with lemon.", "time": "35 mins", "one_pot": False},
-    {"name": "Garlic Green Beans 🥒", "ingredients": {"green beans", "olive oil", "garlic", "lemon", "almonds"}, "instructions": "Blanch beans. Sauté garlic in oil. Toss beans in mix. Top with lemon/almonds.", "time": "15 mins", "one_pot": True},
-    {"name": "Crispy Potato Wedges 🥔", "ingredients": {"potatoes", "oil", "paprika", "salt", "garlic"}, "instructions": "Cut potatoes into wedges. Toss with oil and spices. Bake 400F for 30-35 mins.", "time": "40 mins", "one_pot": True},
-    {"name": "Roasted Butternut Squash 🍠", "ingredients": {"butternut squash", "olive oil", "cinnamon", "maple syrup", "salt"}, "instructions": "Cube squash. Toss with oil, cinnamon, syrup, salt. Roast 400F for 30 mins.", "time": "35 mins", "one_pot": True},
-
-    # --- 3. THE CLASSICS (Vegetarian & Meat) ---
-    {"name": "Roasted Brussels Sprouts 🥬", "ingredients": {"brussels sprouts", "olive oil", "balsamic vinegar", "honey", "salt"}, "instructions": "Halve sprouts. Toss with oil, balsamic, honey, salt. Roast 400F for 20-25 mins until crispy.", "time": "30 mins", "one_pot": True},
-    {"name": "Kale & Apple Salad 🥗", "ingredients": {"kale", "apple", "walnuts", "lemon", "olive oil", "parmesan"}, "instructions": "Massage kale with oil/lemon. Toss with sliced apples, toasted walnuts, and shaved parm.", "time": "15 mins", "one_pot": False},
-    {"name": "Cabbage Stir Fry 🥬", "ingredients": {"cabbage", "soy sauce", "garlic", "ginger", "sesame oil", "carrot"}, "instructions": "Sauté garlic/ginger. Add shredded cabbage and carrot. Stir fry 5 mins. Finish with soy sauce/sesame oil.", "time": "15 mins", "one_pot": True},
-    {"name": "Spinach Chickpea Curry 🥘", "ingredients": {"spinach", "chickpeas", "coconut milk", "curry paste", "onion", "tomato"}, "instructions": "Sauté onion. Add curry paste/tomatoes. Add chickpeas/milk. Simmer. Stir in spinach at the end.", "time": "25 mins", "one_pot": True},
-    {"name": "Honey Glazed Carrots 🥕", "ingredients": {"carrots", "honey", "butter", "parsley", "salt"}, "instructions": "Boil carrots until tender. Drain. Toss in pan with melted butter and honey. Top with parsley.", "time": "20 mins", "one_pot": True},
-    {"name": "Stuffed Mushrooms 🍄", "ingredients": {"mushrooms", "cream cheese", "garlic", "spinach", "breadcrumbs"}, "instructions": "Remove stems. Mix cream cheese, garlic, chopped spinach. Fill caps. Top with breadcrumbs. Bake 375F for 20m.", "time": "30 mins", "one_pot": True},
-    {"name": "Corn & Tomato Salad 🌽", "ingredients": {"corn", "tomato", "onion", "basil", "olive oil", "lime"}, "instructions": "Combine corn, diced tomato, onion, basil. Dress with olive oil and lime juice.", "time": "10 mins", "one_pot": False},
-    {"name": "Broccoli Cheddar Soup 🥦", "ingredients": {"broccoli", "cheese", "milk", "broth", "onion", "flour"}, "instructions": "Sauté onion. Add flour/milk/broth to thicken. Add broccoli, simmer until soft. Stir in cheese.", "time": "25 mins", "one_pot": True},
-    {"name": "Classic Omelette 🍳", "ingredients": {"eggs", "cheese", "butter", "salt"}, "instructions": "Whisk eggs, melt butter, cook until fluffy, add cheese.", "time": "10 mins", "one_pot": True},
-    {"name": "Fluffy Pancakes 🥞", "ingredients": {"eggs", "milk", "flour", "butter", "sugar"}, "instructions": "Mix dry and wet ingredients separately, combine, and fry in butter.", "time": "20 mins", "one_pot": True},
-    {"name": "French Toast 🍞", "ingredients": {"bread", "eggs", "milk", "cinnamon", "butter"}, "instructions": "Dip bread in egg/milk mix, fry in butter until golden brown.", "time": "15 mins", "one_pot": True},
-    {"name": "Oatmeal Bowl 🥣", "ingredients": {"oats", "milk", "honey", "banana", "cinnamon"}, "instructions": "Cook oats in milk, top with sliced banana and honey.", "time": "10 mins", "one_pot": True},
-    {"name": "Avocado Toast with Egg 🥑", "ingredients": {"bread", "avocado", "eggs", "chili flakes", "lemon"}, "instructions": "Toast bread, smash avocado with lemon. Top with fried/poached egg and chili.", "time": "10 mins", "one_pot": True},
-    {"name": "Veggie Breakfast Hash 🥔", "ingredients": {"potatoes", "bell pepper", "onion", "eggs", "oil"}, "instructions": "Dice potatoes, peppers, and onions. Fry until soft/crispy. Crack eggs on top and steam until set.", "time": "25 mins", "one_pot": True},
-    {"name": "Grilled Cheese Sandwich 🥪", "ingredients": {"bread", "cheese", "butter"}, "instructions": "Butter bread, place cheese inside, grill until golden.", "time": "10 mins", "one_pot": True},
-    {"name": "BLT Sandwich 🥓", "ingredients": {"bread", "bacon", "lettuce", "tomato", "mayo"}, "instructions": "Cook bacon, toast bread, layer ingredients with mayo.", "time": "15 mins", "one_pot": True},
-    {"name": "Classic Tuna Salad 🐟", "ingredients": {"tuna", "mayo", "onion", "celery", "bread"}, "instructions": "Mix tuna, mayo, diced onion and celery. Serve on bread or lettuce.", "time": "10 mins", "one_pot": False},
-    {"name": "Caesar Salad 🥗", "ingredients": {"lettuce", "croutons", "parmesan", "chicken", "dressing"}, "instructions": "Toss lettuce with dressing, top with grilled chicken and croutons.", "time": "20 mins", "one_pot": False},
-    {"name": "Greek Salad 🇬🇷", "ingredients": {"cucumber", "tomato", "feta", "olives", "onion", "olive oil"}, "instructions": "Chop veggies roughly. Toss with olive oil and top with block of feta.", "time": "15 mins", "one_pot": False},
-    {"name": "Caprese Salad 🇮🇹", "ingredients": {"tomato", "mozzarella", "basil", "olive oil", "balsamic vinegar"}, "instructions": "Slice tomatoes and cheese, arrange with basil, drizzle with oil.", "time": "10 mins", "one_pot": False},
-    {"name": "Hummus & Veggies 🥕", "ingredients": {"chickpeas", "lemon", "garlic", "olive oil", "tahini", "carrots"}, "instructions": "Blend chickpeas, lemon, garlic, tahini and oil. Serve with carrot sticks.", "time": "15 mins", "one_pot": False},
-    {"name": "Quinoa Salad 🥣", "ingredients": {"quinoa", "cucumber", "tomato", "lemon", "feta", "parsley"}, "instructions": "Cook quinoa. Mix with chopped veggies, crumbled feta, lemon juice and herbs.", "time": "20 mins", "one_pot": True},
-    {"name": "Zucchini Fritters 🥒", "ingredients": {"zucchini", "flour", "eggs", "cheese", "garlic", "oil"}, "instructions": "Grate zucchini and squeeze out water. Mix with flour, egg, cheese. Fry spoonfuls in oil until crispy.", "time": "25 mins", "one_pot": True},
-    {"name": "Tomato Pasta 🍝", "ingredients": {"pasta", "tomato sauce", "garlic", "olive oil"}, "instructions": "Boil pasta, sauté garlic in oil, add sauce, mix.", "time": "15 mins", "one_pot": False},
-    {"name": "Pesto Pasta 🍃", "ingredients": {"pasta", "pesto", "parmesan", "cherry tomatoes"}, "instructions": "Boil pasta. Save some pasta water. Toss pasta with pesto and a splash of water. Top with tomatoes.", "time": "15 mins", "one_pot": False},
-    {"name": "Garlic Butter Shrimp 🍤", "ingredients": {"shrimp", "butter", "garlic", "lemon", "parsley"}, "instructions": "Sauté garlic in butter. Add shrimp, cook 3 mins. Finish with lemon/parsley.", "time": "15 mins", "one_pot": True},
-    {"name": "Chicken Stir Fry 🥡", "ingredients": {"chicken", "rice", "soy sauce", "vegetables", "oil"}, "instructions": "Cook chicken, add veggies, stir in sauce, serve over rice.", "time": "25 mins", "one_pot": True},
-    {"name": "Tofu Stir Fry 🥦", "ingredients": {"tofu", "soy sauce", "ginger", "garlic", "broccoli", "rice"}, "instructions": "Press tofu, cube, and fry. Remove. Fry aromatics and broccoli. Combine with sauce over rice.", "time": "30 mins", "one_pot": True},
-    {"name": "Beef & Broccoli 🥦", "ingredients": {"beef", "broccoli", "soy sauce", "garlic", "rice", "sugar"}, "instructions": "Sear beef strips. Steam broccoli. Toss both in soy/garlic/sugar sauce. Serve over rice.", "time": "25 mins", "one_pot": True},
-    {"name": "Spaghetti Carbonara 🇮🇹", "ingredients": {"pasta", "eggs", "cheese", "bacon", "black pepper"}, "instructions": "Boil pasta. Fry bacon. Mix eggs and cheese. Toss hot pasta with egg mix (off heat).", "time": "20 mins", "one_pot": False},
-    {"name": "Simple Tacos 🌮", "ingredients": {"tortilla", "ground beef", "cheese", "lettuce", "salsa"}, "instructions": "Cook meat, fill tortillas, top with cheese and salsa.", "time": "20 mins", "one_pot": True},
-    {"name": "Black Bean Burrito 🌯", "ingredients": {"tortilla", "black beans", "rice", "cheese", "salsa", "corn"}, "instructions": "Warm beans and corn. Layer rice, beans, corn, and cheese in tortilla. Roll and serve.", "time": "15 mins", "one_pot": False},
-    {"name": "Chicken Curry 🍛", "ingredients": {"chicken", "curry paste", "coconut milk", "rice", "onion"}, "instructions": "Fry onion and chicken, add paste, pour in milk, simmer. Serve with rice.", "time": "30 mins", "one_pot": True},
-    {"name": "Fried Rice 🍚", "ingredients": {"rice", "eggs", "soy sauce", "peas", "carrots", "oil"}, "instructions": "Fry veggies, push to side, scramble eggs, add rice and sauce, mix high heat.", "time": "20 mins", "one_pot": True},
-    {"name": "Homemade Pizza 🍕", "ingredients": {"flour", "yeast", "tomato sauce", "cheese", "pepperoni"}, "instructions": "Make dough, add sauce and toppings, bake at high heat (450F) for 12 mins.", "time": "45 mins", "one_pot": True},
-    {"name": "Mac & Cheese 🧀", "ingredients": {"pasta", "cheese", "milk", "butter", "flour"}, "instructions": "Make a roux with flour/butter, add milk to thicken, melt cheese in. Pour over cooked pasta.", "time": "25 mins", "one_pot": True},
-    {"name": "Mushroom Risotto 🍄", "ingredients": {"rice", "mushrooms", "broth", "butter", "parmesan", "onion"}, "instructions": "Sauté onions/mushrooms. Toast rice. Add broth ladle by ladle, stirring constantly.", "time": "40 mins", "one_pot": True},
-    {"name": "Quesadillas 🧀", "ingredients": {"tortilla", "cheese", "chicken", "onion", "salsa"}, "instructions": "Place cheese and chicken on tortilla, fold, fry in pan until crispy.", "time": "15 mins", "one_pot": True},
-    {"name": "Mashed Potatoes & Chicken 🍗", "ingredients": {"potatoes", "butter", "milk", "chicken", "salt"}, "instructions": "Boil and mash potatoes with butter/milk. Serve with roasted chicken.", "time": "45 mins", "one_pot": False},
-    {"name": "Chicken Noodle Soup 🍜", "ingredients": {"chicken", "broth", "carrots", "celery", "pasta", "onion"}, "instructions": "Sauté veggies. Add broth and chicken. Simmer. Add pasta near the end.", "time": "40 mins", "one_pot": True},
-    {"name": "Baked Salmon 🐟", "ingredients": {"salmon", "lemon", "butter", "garlic", "herbs"}, "instructions": "Place salmon on foil. Top with butter, garlic, lemon. Bake 400F for 12-15 mins.", "time": "20 mins", "one_pot": True},
-    {"name": "Stuffed Bell Peppers 🫑", "ingredients": {"bell pepper", "ground beef", "rice", "cheese", "tomato sauce"}, "instructions": "Hollow out peppers. Fill with cooked beef/rice/sauce mix. Top with cheese. Bake 375F for 30m.", "time": "45 mins", "one_pot": True},
-    {"name": "Veggie Fajitas 🌮", "ingredients": {"bell pepper", "onion", "tortilla", "lime", "oil", "chili powder"}, "instructions": "Slice peppers and onions. Fry in hot oil with spices. Serve in warm tortillas with lime.", "time": "20 mins", "one_pot": True},
-    {"name": "Ratatouille 🍆", "ingredients": {"zucchini", "eggplant", "bell pepper", "tomato", "onion", "olive oil"}, "instructions": "Slice all veggies into rounds. Layer in a baking dish with oil and herbs. Bake until tender.", "time": "50 mins", "one_pot": True},
-    {"name": "Eggplant Parmesan 🍆", "ingredients": {"eggplant", "tomato sauce", "cheese", "flour", "oil", "parmesan"}, "instructions": "Bread and fry eggplant slices. Layer with sauce and cheeses in dish. Bake until bubbly.", "time": "50 mins", "one_pot": True},
-    {"name": "Roasted Cauliflower Tacos 🌮", "ingredients": {"cauliflower", "tortilla", "lime", "cabbage", "avocado", "oil"}, "instructions": "Roast cauliflower florets with spices. Serve in tacos with cabbage slaw and avocado.", "time": "30 mins", "one_pot": True},
-    {"name": "Banana Bread 🍌", "ingredients": {"banana", "flour", "sugar", "butter", "eggs"}, "instructions": "Mash bananas, mix with wet then dry ingredients. Bake 350F for 60 mins.", "time": "70 mins", "one_pot": True},
-    {"name": "Choc Chip Cookies 🍪", "ingredients": {"flour", "sugar", "butter", "chocolate chips", "eggs", "baking powder"}, "instructions": "Cream butter/sugar, add eggs, mix in dry ingredients and chocolate. Bake 350F for 10m.", "time": "20 mins", "one_pot": True},
-    {"name": "Chocolate Mug Cake ☕", "ingredients": {"flour", "sugar", "cocoa powder", "milk", "oil", "chocolate chips"}, "instructions": "Mix all ingredients in a microwave-safe mug. Microwave for 60-90 seconds.", "time": "5 mins", "one_pot": True},
-    {"name": "Guacamole & Chips 🥑", "ingredients": {"avocado", "onion", "tomato", "lime", "tortilla chips"}, "instructions": "Mash avocado with lime and salt. Stir in diced onion/tomato. Serve with chips.", "time": "10 mins", "one_pot": False},
-    {"name": "Apple Slices & Peanut Butter 🍎", "ingredients": {"apple", "peanut butter"}, "instructions": "Slice apple, dip in peanut butter. Simple and healthy.", "time": "5 mins", "one_pot": False},
-    {"name": "Deviled Eggs 🥚", "ingredients": {"eggs", "mayo", "mustard", "paprika"}, "instructions": "Boil eggs, peel, halve. Mix yolks with mayo/mustard. Pipe back in. Dust paprika.", "time": "20 mins", "one_pot": True},
-    {"name": "Sweet Potato Fries 🍟", "ingredients": {"sweet potato", "oil", "salt", "paprika", "cornstarch"}, "instructions": "Cut potatoes into sticks. Toss with cornstarch, oil, spices. Bake 425F until crispy (25m).", "time": "35 mins", "one_pot": True},
-    {"name": "Roasted Asparagus 🌿", "ingredients": {"asparagus", "olive oil", "lemon", "parmesan", "garlic"}, "instructions": "Toss asparagus in oil and garlic. Roast 400F for 10-15 mins. Top with lemon/parmesan.", "time": "20 mins", "one_pot": True}
-]
-
-# --- APP LOGIC ---
-
-all_possible_ingredients = set()
-for r in recipes:
-    all_possible_ingredients.update(r['ingredients'])
-
-sorted_ingredients = sorted(list(all_possible_ingredients))
+# Catalog, resolver and scoring live in the kitchen_sync package; this page
+# only caches them per process and draws the results.
+@st.cache_resource(show_spinner=False)
+def load_catalog(path):
+    catalog = open_catalog(path)
+    catalog.lsh  # build (or read) the "more like this" index now, not in the first card render
+    return catalog
+
+@st.cache_resource(show_spinner=False)
+def load_resolver(path):
+    return IngredientResolver(load_catalog(path).ingredients)
+
+PAGE_SIZE = 20
+
+catalog = load_catalog(DEFAULT_CATALOG_PATH)
+perf.lap("catalog")
 
 # --- SIDEBAR ---
 st.sidebar.write("What do you have?")
 user_input_text = st.sidebar.text_area("Type items (e.g. eggs, onions, tofu):", "eggs, cheese, butter")
 
 # PROCESS INPUT
-raw_items = re.split(r'[,\n]', user_input_text)
-cleaned_items = [x.strip().lower() for x in raw_items if x.strip()]
-
-user_fridge = set()
-recognized_items = []
-
-for item in cleaned_items:
-    if item in sorted_ingredients:
-        user_fridge.add(item)
-        recognized_items.append(item)
-    else:
-        for db_item in sorted_ingredients:
-            if item in db_item or db_item in item: 
-                if len(item) > 3 and (item in db_item or db_item in item):
-                    user_fridge.add(db_item)
-                    recognized_items.append(db_item)
-                    break
-                elif item == db_item[:-1]:
-                    user_fridge.add(db_item)
-                    recognized_items.append(db_item)
-                    break
+user_fridge, recognized_items = parse_fridge(user_input_text, load_resolver(DEFAULT_CATALOG_PATH))
+perf.count("fridge_items", len(user_fridge))
+perf.lap("parse_input")
 
 if recognized_items:
     st.sidebar.write("Found ingredients:")
-    tags_html = "".join([f'<span class="sidebar-tag">{ing}</span>' for ing in set(recognized_items)])
+    tags_html = "".join([tag_html("sidebar-tag", ing) for ing in set(recognized_items)])
     st.sidebar.markdown(tags_html, unsafe_allow_html=True)
 
 st.sidebar.markdown("---")
 only_full_match = st.sidebar.checkbox("✅ Cook Now (Full Match)", value=False)
+max_time = st.sidebar.select_slider("⏱️ Max Time", options=["10 mins", "15 mins", "20 mins", "30 mins", "45 mins", "60 mins", "Any"], value="Any")
+max_minutes = None if max_time == "Any" else parse_minutes(max_time)
+excluded_allergens = st.sidebar.multiselect("🚫 Exclude Allergens", list(ALLERGEN_GROUPS))
+fast_cards = st.sidebar.toggle("⚡ Fast Cards", value=False, help="Draw each column of cards as one HTML block")
+st.sidebar.toggle("📊 Performance", key="perf_panel", help="Time each stage of this page and log it as JSON lines")
+perf.lap("sidebar")
 
 # --- TABS ---
 st.write(" ")
-tab1, tab2, tab3, tab4 = st.tabs(["🍽 All Recipes", "🌱 Vegan", "🥘 One Pot", "🥕 Simple (5-6 Ingred)"])
-
-def render_recipes(filter_mode="all"):
-    matches = []
-    
-    for recipe in recipes:
-        required_ingredients = recipe['ingredients']
-        matching_items = user_fridge.intersection(required_ingredients)
-        missing_items = required_ingredients - user_fridge
-        match_percent = int((len(matching_items) / len(required_ingredients)) * 100)
-        
-        # GLOBAL FILTER
-        if only_full_match and match_percent < 100:
-            continue
-            
-        # TAB FILTERS
-        if filter_mode == "vegan":
-            if not required_ingredients.isdisjoint(NON_VEGAN_ITEMS):
-                continue
-        elif filter_mode == "simple":
-            if not (5 <= len(required_ingredients) <= 6):
-                continue
-        elif filter_mode == "one_pot":
-            if not recipe.get("one_pot", False):
-                continue
-        
-        if len(matching_items) >= 1:
-            matches.append({
-                "recipe": recipe,
-                "matching_items": matching_items,
-                "missing_items": missing_items,
-                "match_percent": match_percent
-            })
-            
-    matches.sort(key=lambda x: x['match_percent'], reverse=True)
+TAB_LABELS = dict(zip(TABS, ["🍽 All Recipes", "🌱 Vegan", "🥘 One Pot", "🥕 Simple (5-6 Ingred)"]))
+tab1, tab2, tab3, tab4 = st.tabs(list(TAB_LABELS.values()))
+
+@st.cache_resource(show_spinner=False)
+def load_card_fragments(path):
+    return make_card_fragments(load_catalog(path))
+
+def show_more(filter_mode):
+    st.session_state[f"shown_{filter_mode}"] += PAGE_SIZE
+
+def render_recipes(scorer, filter_mode="all"):
+    # Each tab + sidebar filter combination is a ranked view the session scorer keeps
+    # current through fridge edits; only the visible pages get described and built
+    shown = st.session_state.setdefault(f"shown_{filter_mode}", PAGE_SIZE)
+    filters = Filters(filter_mode, only_full_match, max_minutes, excluded_allergens)
+    total, page = scorer.match(filters, limit=shown)
+    perf.count(f"{filter_mode}_results", total)
+    perf.lap(f"{filter_mode}_match")
     
-    if not matches:
+    if not page:
         st.info("No recipes found in this category with your current ingredients!")
+        perf.lap(f"{filter_mode}_render")
         return
 
     col1, col2 = st.columns(2)
-    for i, item in enumerate(matches):
-        recipe = item['recipe']
-        ing_count = len(recipe['ingredients'])
+    if fast_cards:
+        # One markdown delta per column instead of ~8 widgets per card
+        card_fragments = load_card_fragments(DEFAULT_CATALOG_PATH)
+        cards = [card_html(item, card_fragments, show_missing=not only_full_match) for item in page]
+        col1.markdown("".join(cards[0::2]), unsafe_allow_html=True)
+        col2.markdown("".join(cards[1::2]), unsafe_allow_html=True)
+    else:
+        for i, item in enumerate(page):
+            recipe = item.recipe
+            ing_count = len(recipe.ingredient_ids)
         
-        with (col1 if i % 2 == 0 else col2):
-            with st.container(border=True):
-                st.subheader(recipe['name'])
-                st.markdown(f'<div class="sub-text">⏱️ {recipe.get("time", "--")}</div>', unsafe_allow_html=True)
+            with (col1 if i % 2 == 0 else col2):
+                with st.container(border=True):
+                    st.subheader(recipe.name)
+                    st.markdown(f'<div class="sub-text">⏱️ {recipe.time}</div>', unsafe_allow_html=True)
                 
-                if item['match_percent'] == 100:
-                    st.progress(item['match_percent'], text="🔥 Perfect Match!")
-                else:
-                    st.progress(item['match_percent'], text=f"{item['match_percent']}% Match")
+                    if item.match_percent == 100:
+                        st.progress(item.match_percent, text="🔥 Perfect Match!")
+                    else:
+                        st.progress(item.match_percent, text=f"{item.match_percent}% Match")
                 
-                st.write("**You have:**")
-                have_html = "".join([f'<span class="have-tag">✔ {ing}</span>' for ing in item['matching_items']])
-                st.markdown(have_html, unsafe_allow_html=True)
+                    st.write("**You have:**")
+                    have_html = "".join([tag_html("have-tag", f"✔ {ing}") for ing in item.matching_items])
+                    st.markdown(have_html, unsafe_allow_html=True)
                 
-                if item['missing_items'] and not only_full_match:
-                    st.write("**You need:**")
-                    missing_html = "".join([f'<span class="missing-tag">{ing}</span>' for ing in item['missing_items']])
-                    st.markdown(missing_html, unsafe_allow_html=True)
+                    if item.missing_items and not only_full_match:
+                        st.write("**You need:**")
+                        missing_html = "".join([tag_html("missing-tag", swap_label(item, ing)) for ing in item.missing_items])
+                        st.markdown(missing_html, unsafe_allow_html=True)
                 
-                if item['match_percent'] == 100:
-                     st.success("✅ Ready to cook!")
-
-                with st.expander("📝 View Instructions"):
-                    st.write(recipe['instructions'])
-
-# Render content
-with tab1: render_recipes("all")
-with tab2: render_recipes("vegan")
-with tab3: render_recipes("one_pot")
-with tab4: render_recipes("simple")
+                    if item.match_percent == 100:
+                         st.success("✅ Ready to cook!")
+
+                    with st.expander("📝 View Instructions"):
+                        st.write(recipe.instructions)
+
+                    similar = catalog.similar(item.recipe_id)
+                    if similar:
+                        with st.expander("🔁 More like this"):
+                            st.markdown("\n".join(f"- {catalog.recipes[other].name} · {round(jaccard * 100)}% alike" for jaccard, other in similar))
+
+    if total > shown:
+        st.caption(f"Showing {shown} of {total} recipes")
+        st.button("Load more", key=f"more_{filter_mode}", on_click=show_more, args=(filter_mode,))
+    perf.lap(f"{filter_mode}_render")
+
+perf.lap("tabs_setup")
+
+# Render content: score once, then each tab is a ranked, filtered view of the same results.
+# Each session keeps its match state and only applies the items added or removed since the last rerun.
+scorer = st.session_state.get("scorer")
+if scorer is None or scorer.catalog is not catalog:
+    scorer = st.session_state["scorer"] = IncrementalScorer(catalog)
+scorer.update(user_fridge)
+perf.count("scored", len(scorer.full if only_full_match else scorer.keys))
+perf.lap("score")
+results_key = (frozenset(user_fridge), only_full_match, max_minutes, tuple(excluded_allergens))
+
+# New input starts every tab back on its first page
+if st.session_state.get("results_key") != results_key:
+    st.session_state["results_key"] = results_key
+    for filter_mode in TABS:
+        st.session_state[f"shown_{filter_mode}"] = PAGE_SIZE
+
+with tab1: render_recipes(scorer, "all")
+with tab2: render_recipes(scorer, "vegan")
+with tab3: render_recipes(scorer, "one_pot")
+with tab4: render_recipes(scorer, "simple")
+
+# --- SHOPPING LIST ---
+# The few items to buy that turn the most near-matches into full matches. Only worked
+# out when asked (the expander body runs on every rerun), then kept for the session
+# until the fridge, the filters or these settings change.
+with st.sidebar.expander("🛒 What should I buy?"):
+    budget = st.slider("Items to buy", 1, 5, 3)
+    shop_tab = st.selectbox("Recipes", TABS, format_func=TAB_LABELS.get)
+    shopping_key = (frozenset(user_fridge), max_minutes, tuple(excluded_allergens), budget, shop_tab)
+    if st.button("Suggest", key="suggest_purchases"):
+        purchases = suggest_purchases(catalog, user_fridge, budget, shop_tab, max_minutes, excluded_allergens, scores=scorer.scores())
+        st.session_state["shopping"] = (shopping_key, purchases)
+    saved_key, purchases = st.session_state.get("shopping", (None, None))
+    if saved_key == shopping_key:
+        if not purchases:
+            st.caption("No recipe is that close yet. Add a few more items!")
+        for purchase in purchases:
+            st.markdown(f"**+ {', '.join(purchase.ingredients)}** unlocks {len(purchase.unlocked)} more")
+            names = [catalog.recipes[recipe_id].name for recipe_id in purchase.unlocked]
+            st.caption(" · ".join(names[:5]) + (" …" if len(names) > 5 else ""))
+perf.lap("shopping")
+
+# --- PERFORMANCE PANEL ---
+if perf.enabled:
+    configure_log(os.environ.get("KITCHEN_SYNC_PERF_LOG"))
+    perf.log(fast_cards=fast_cards)
+    with st.sidebar.expander("📊 Performance", expanded=True):
+        st.caption(f"This rerun: {sum(perf.stages.values()):.1f} ms")
+        st.table({"stage": list(perf.stages), "ms": [round(ms, 2) for ms in perf.stages.values()]})
+        st.caption(" · ".join(f"{name}: {value}" for name, value in perf.counts.items()))
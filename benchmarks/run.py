@@ -0,0 +1,211 @@
+"""Time the hot paths on synthetic catalogs and write machine-readable results.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 -o bench.json
+    python -m benchmarks.run --sizes 1000 10000 100000 --compare bench.json
+
+Every stage is timed over the same seeded fridges (median / min per fridge in
+milliseconds) and measured once more under tracemalloc for peak memory.
+--compare exits with status 1 when a stage's median got slower than
+--threshold times the baseline.
+"""
+import sys
+import json
+import time
+import heapq
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+
+from kitchen_sync import Catalog, Filters, IncrementalScorer, IngredientResolver, describe_match, match, parse_fridge, plan_filter, score, suggest_purchases
+from kitchen_sync.cards import card_html, make_card_fragments
+from kitchen_sync.catalog import np
+from kitchen_sync.similar import MinHashLSH
+
+from .synthetic import make_catalog, make_fridges
+
+
+def measure(fn, inputs, repeat, reset=None):
+    # Per-input times over `repeat` passes, then one extra pass for peak memory.
+    # `reset` (if given) runs untimed before every pass, for stages that carry state.
+    fn(inputs[0])  # warm-up
+    times = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        for x in inputs:
+            start = time.perf_counter()
+            fn(x)
+            times.append(time.perf_counter() - start)
+
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    for x in inputs:
+        fn(x)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": min(times) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def bench_size(n_recipes, args):
+    records = make_catalog(n_recipes, args.ingredients, seed=args.seed)
+
+    # Timed without tracing (tracemalloc slows building several times over), then
+    # built once more under tracemalloc for the peak, as measure() does
+    start = time.perf_counter()
+    catalog = Catalog(records)
+    load_ms = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    Catalog(records)
+    load_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # The similarity index is built lazily on the first similar() call, so it is timed on its own
+    ingredient_sets = [r.ingredient_ids for r in catalog.recipes]
+    start = time.perf_counter()
+    catalog.lsh = MinHashLSH(ingredient_sets, len(catalog.ingredients))
+    lsh_ms = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    MinHashLSH(ingredient_sets, len(catalog.ingredients))
+    lsh_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    popular = sorted(catalog.ingredients, key=lambda ing: -len(catalog.postings[catalog.ingredient_ids[ing]]))
+    texts = make_fridges(popular, args.fridges, seed=args.seed + 1)
+    resolver = IngredientResolver(catalog.ingredients)
+    fridges = [parse_fridge(text, resolver)[0] for text in texts]
+    filters = Filters("vegan", max_minutes=30, excluded_allergens=("Nuts",))
+    fragments = make_card_fragments(catalog)
+
+    # A user editing one item per rerun: each fridge differs from the previous by one ingredient
+    rng = random.Random(args.seed + 2)
+    edits = [set(fridges[0])]
+    for _ in range(len(fridges)):
+        fridge = set(edits[-1])
+        if fridge and rng.random() < 0.5:
+            fridge.discard(rng.choice(sorted(fridge)))
+        else:
+            fridge.add(rng.choice(popular[:500]))
+        edits.append(fridge)
+    scorer = IncrementalScorer(catalog)
+    # Every pass starts from edits[0], so each timed update is a one-item edit
+    resets = {"score_incremental": lambda: scorer.update(edits[0])}
+
+    def score_incremental(fridge):
+        scorer.update(fridge)
+        return scorer.scores()
+
+    def parse_cold(text):
+        resolver.resolve.cache_clear()
+        parse_fridge(text, resolver)
+
+    def filter_view(fridge):
+        mask = plan_filter(catalog, filters.tab, filters.max_minutes, filters.excluded_allergens)
+        return [m for m in score(catalog, fridge) if mask[m[3]]]
+
+    def rank(fridge):
+        best = heapq.nsmallest(args.top, score(catalog, fridge))
+        return [describe_match(catalog, fridge, m) for m in best]
+
+    def render(fridge):
+        return "".join(card_html(item, fragments) for item in match(catalog, fridge, limit=args.top).results)
+
+    stages = {
+        "parse": (parse_cold, texts),
+        "parse_cached": (lambda text: parse_fridge(text, resolver), texts),
+        "score_index": (lambda fridge: score(catalog, fridge, engine="index"), fridges),
+        "score_incremental": (score_incremental, edits[1:]),
+        "filter": (filter_view, fridges),
+        "rank": (rank, fridges),
+        "render": (render, fridges),
+        "match": (lambda fridge: match(catalog, fridge, filters, limit=args.top), fridges),
+        "shopping": (lambda fridge: suggest_purchases(catalog, fridge, budget=3), fridges),
+        "similar": (catalog._similar, random.Random(args.seed + 3).sample(range(n_recipes), min(n_recipes, args.fridges))),
+    }
+    if np is not None:
+        stages["score_numpy"] = (lambda fridge: score(catalog, fridge, engine="numpy"), fridges)
+
+    results = [
+        {"stage": "load", "recipes": n_recipes, "median_ms": load_ms, "min_ms": load_ms, "peak_kib": load_peak / 1024},
+        {"stage": "similar_index", "recipes": n_recipes, "median_ms": lsh_ms, "min_ms": lsh_ms, "peak_kib": lsh_peak / 1024},
+    ]
+    for stage, (fn, inputs) in stages.items():
+        results.append({"stage": stage, "recipes": n_recipes, **measure(fn, inputs, args.repeat, resets.get(stage))})
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    # Print old vs new medians; True when any stage regressed past the threshold
+    old = {(r["stage"], r["recipes"]): r["median_ms"] for r in baseline["results"]}
+    regressed = False
+    for r in results:
+        before = old.get((r["stage"], r["recipes"]))
+        if before is None:
+            continue
+        ratio = r["median_ms"] / before if before else float("inf")
+        flag = "REGRESSION" if ratio > threshold else ""
+        regressed |= ratio > threshold
+        print(f"{r['stage']:>14} {r['recipes']:>9} {before:10.3f} -> {r['median_ms']:10.3f} ms  x{ratio:5.2f} {flag}", file=sys.stderr)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="catalog sizes in recipes (up to 1000000)")
+    parser.add_argument("--ingredients", type=int, default=5000, help="ingredient vocabulary size")
+    parser.add_argument("--fridges", type=int, default=200, help="fridges timed per stage")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the fridges")
+    parser.add_argument("--top", type=int, default=20, help="results ranked / rendered per fridge")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="-", help="where to write the JSON results (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n_recipes in args.sizes:
+        results.extend(bench_size(n_recipes, args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__ if np is not None else None,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "ingredients": args.ingredients,
+            "fridges": args.fridges,
+            "repeat": args.repeat,
+            "top": args.top,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            return 1 if compare(results, json.load(f), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,73 @@
+"""Seeded synthetic recipe catalogs and fridge inputs for the benchmarks.
+
+Ingredient popularity follows a Zipf law, so a handful of staples (the real
+catalog's ingredients come first) show up everywhere and the long tail rarely.
+"""
+import os
+import random
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate
+
+from kitchen_sync.catalog import read_recipe_records
+
+# Always the bundled catalog (not KITCHEN_SYNC_CATALOG), so a seed gives the same catalog everywhere
+BUNDLED_CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "recipes.jsonl")
+
+
+def zipf_weights(n, s=1.1):
+    return list(accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+@lru_cache(maxsize=1)
+def real_ingredients():
+    # The bundled catalog's ingredients by how many recipes use them, ties by name
+    counts = Counter(ing for rec in read_recipe_records(BUNDLED_CATALOG_PATH) for ing in set(map(str, rec["ingredients"])))
+    return tuple(sorted(sorted(counts), key=lambda ing: -counts[ing]))
+
+
+def make_vocabulary(n_ingredients):
+    # Most popular first: the real catalog's ingredients (they carry the vegan / allergen
+    # meaning), then made-up ones
+    real = real_ingredients()
+    return list(real[:n_ingredients]) + [f"ingredient {i:05d}" for i in range(n_ingredients - len(real))]
+
+
+def make_catalog(n_recipes, n_ingredients=5000, seed=0, s=1.1, sizes=(2, 12)):
+    # Recipe records in the shape read_recipe_records yields
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(n_ingredients)
+    cum_weights = zipf_weights(len(vocabulary), s)
+    records = []
+    for i in range(n_recipes):
+        size = rng.randint(*sizes)
+        ingredients = set(rng.choices(vocabulary, cum_weights=cum_weights, k=size))
+        records.append({
+            "name": f"Recipe {i}",
+            "ingredients": sorted(ingredients),
+            "instructions": "Combine everything and cook until done.",
+            "time": f"{rng.choice((5, 10, 15, 20, 25, 30, 40, 45, 60, 90))} mins",
+            "one_pot": rng.random() < 0.6,
+        })
+    return records
+
+
+def make_fridges(vocabulary, n_fridges, seed=0, s=1.1, sizes=(3, 25)):
+    # Fridges as typed text drawn from `vocabulary` (most popular first): mostly
+    # catalog names, some plurals / capitals, some unknown words
+    rng = random.Random(seed)
+    cum_weights = zipf_weights(len(vocabulary), s)
+    fridges = []
+    for _ in range(n_fridges):
+        items = []
+        for ing in rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(*sizes)):
+            roll = rng.random()
+            if roll < 0.15:
+                ing = ing + "s"
+            elif roll < 0.25:
+                ing = ing.title()
+            elif roll < 0.30:
+                ing = f"zz{rng.randrange(10 ** 6)}"
+            items.append(ing)
+        fridges.append(", ".join(items))
+    return fridges
@@ -0,0 +1,5 @@
+"""Kitchen Sync: match what's in the fridge against a recipe catalog, without Streamlit."""
+from .catalog import ALLERGEN_GROUPS, DEFAULT_CATALOG_PATH, NON_VEGAN_ITEMS, SUBSTITUTIONS, Catalog, Recipe, open_catalog, parse_minutes, read_recipe_records
+from .matching import SCORING_ENGINE, TABS, Filters, IncrementalScorer, Matches, MatchResult, describe_match, find_swaps, match, plan_filter, score
+from .resolver import INGREDIENT_ALIASES, IngredientResolver, parse_fridge
+from .shopping import Purchase, suggest_purchases
@@ -0,0 +1,55 @@
+"""HTML for the result cards and ingredient tags, styled by the page's .recipe-card / .have-tag / .missing-tag CSS."""
+from functools import lru_cache
+from html import escape
+
+
+def make_card_fragments(catalog, cache_size=4096):
+    # recipe_id -> (title/time header, <details> instructions and similar recipes): the parts of a card that never change
+    @lru_cache(maxsize=cache_size)
+    def card_fragments(recipe_id):
+        recipe = catalog.recipes[recipe_id]
+        header = f'<h3>{escape(recipe.name)}</h3><div class="sub-text">⏱️ {escape(recipe.time)}</div>'
+        details = f'<details><summary>📝 View Instructions</summary><p>{escape(recipe.instructions)}</p></details>'
+        similar = catalog.similar(recipe_id)
+        if similar:
+            items = "".join(f'<li>{escape(catalog.recipes[other].name)} · {round(jaccard * 100)}% alike</li>' for jaccard, other in similar)
+            details += f'<details><summary>🔁 More like this</summary><ul>{items}</ul></details>'
+        return header, details
+
+    return card_fragments
+
+
+@lru_cache(maxsize=4096)
+def tag_html(css_class, text):
+    # One escaped <span> tag; the same few ingredient tags repeat on every card and rerun
+    return f'<span class="{css_class}">{escape(text)}</span>'
+
+
+def swap_label(item, ing):
+    # "olive oil ≈ oil" when a fridge item partly stands in for a missing one
+    have = item.substitutes.get(ing)
+    return f"{ing} ≈ {have}" if have else ing
+
+
+def card_html(item, card_fragments, show_missing=True):
+    # One MatchResult as a single HTML string (mirrors the widget card in app.py)
+    header, details = card_fragments(item.recipe_id)
+    percent = item.match_percent
+    label = "🔥 Perfect Match!" if percent == 100 else f"{percent}% Match"
+    parts = [
+        '<div class="recipe-card">',
+        header,
+        f'<div class="card-progress">{label}<div class="card-progress-track"><div class="card-progress-fill" style="width: {percent}%"></div></div></div>',
+        '<p><strong>You have:</strong></p><div>',
+        "".join([tag_html("have-tag", f"✔ {ing}") for ing in item.matching_items]),
+        '</div>',
+    ]
+    if item.missing_items and show_missing:
+        parts.append('<p><strong>You need:</strong></p><div>')
+        parts.append("".join([tag_html("missing-tag", swap_label(item, ing)) for ing in item.missing_items]))
+        parts.append('</div>')
+    if percent == 100:
+        parts.append('<div class="card-ready">✅ Ready to cook!</div>')
+    parts.append(details)
+    parts.append('</div>')
+    return "".join(parts)
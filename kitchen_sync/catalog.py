@@ -0,0 +1,291 @@
+"""Recipe catalog: loading from JSONL / Parquet / SQLite and the indexes built at load time."""
+import os
+import re
+import sys
+import json
+import math
+import heapq
+import bisect
+import sqlite3
+from array import array
+from functools import cached_property, lru_cache
+
+from .similar import MinHashLSH
+
+try:
+    import numpy as np
+except ImportError:  # the bit-matrix engine is optional
+    np = None
+
+# Bundled catalog; KITCHEN_SYNC_CATALOG points at another JSONL, Parquet or SQLite file
+DEFAULT_CATALOG_PATH = os.environ.get(
+    "KITCHEN_SYNC_CATALOG",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "recipes.jsonl"),
+)
+
+NON_VEGAN_ITEMS = {"eggs", "cheese", "butter", "milk", "chicken", "beef", "bacon", "tuna", "salmon", "shrimp", "honey", "cream cheese", "yogurt", "mayo", "ground beef", "parmesan", "mozzarella", "feta"}
+
+ALLERGEN_GROUPS = {
+    "Dairy": {"butter", "cheese", "milk", "cream cheese", "yogurt", "parmesan", "mozzarella", "feta"},
+    "Eggs": {"eggs", "mayo"},
+    "Gluten": {"bread", "pasta", "flour", "tortilla", "breadcrumbs", "croutons"},
+    "Nuts": {"peanut butter", "almonds", "walnuts"},
+    "Fish & Shellfish": {"tuna", "salmon", "shrimp"},
+    "Soy": {"soy sauce", "tofu"},
+    "Sesame": {"sesame oil", "tahini"},
+}
+
+# Pantry swaps: (a, b, credit) lets either one stand in for the other at `credit` of a
+# real match. Swaps chain (butter -> oil -> olive oil) at the product of their credits,
+# down to MIN_SUBSTITUTE_CREDIT.
+SUBSTITUTIONS = [
+    ("butter", "oil", 0.75),
+    ("oil", "olive oil", 0.9),
+    ("oil", "sesame oil", 0.75),
+    ("lemon", "lime", 0.9),
+    ("broth", "vegetable broth", 0.9),
+    ("carrot", "carrots", 1.0),
+    ("pepper", "black pepper", 1.0),
+    ("tomato", "cherry tomatoes", 0.9),
+    ("tomato", "tomato sauce", 0.5),
+    ("salsa", "tomato sauce", 0.5),
+    ("beef", "ground beef", 0.9),
+    ("cheese", "mozzarella", 0.75),
+    ("cheese", "parmesan", 0.75),
+    ("cheese", "feta", 0.5),
+    ("chili flakes", "chili powder", 0.75),
+    ("herbs", "parsley", 0.75),
+    ("herbs", "basil", 0.75),
+    ("honey", "maple syrup", 0.75),
+    ("almonds", "walnuts", 0.75),
+    ("peanut butter", "tahini", 0.5),
+    ("milk", "coconut milk", 0.5),
+    ("rice", "quinoa", 0.5),
+]
+MIN_SUBSTITUTE_CREDIT = 0.5
+
+
+def substitute_closure(substitutions=SUBSTITUTIONS, min_credit=MIN_SUBSTITUTE_CREDIT):
+    # name -> {other name: best credit over any chain of swaps, in whole percent}
+    graph = {}
+    for a, b, credit in substitutions:
+        graph.setdefault(a, []).append((b, credit))
+        graph.setdefault(b, []).append((a, credit))
+
+    closure = {}
+    for source in graph:
+        # Dijkstra on the product of credits: it only shrinks along a chain
+        best = {source: 1.0}
+        heap = [(-1.0, source)]
+        while heap:
+            credit, ing = heapq.heappop(heap)
+            if -credit < best[ing]:
+                continue
+            for other, weight in graph[ing]:
+                chained = -credit * weight
+                if chained >= min_credit and chained > best.get(other, 0.0):
+                    best[other] = chained
+                    heapq.heappush(heap, (-chained, other))
+        del best[source]
+        closure[source] = {other: round(credit * 100) for other, credit in best.items()}
+    return closure
+
+
+def read_recipe_records(path):
+    # One dict per recipe: name, ingredients (list of names), instructions, time, one_pot
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ext == ".parquet":
+        import pandas as pd
+        yield from pd.read_parquet(path).to_dict("records")
+    elif ext in (".db", ".sqlite", ".sqlite3"):
+        # Table `recipes`, with `ingredients` stored as a JSON array
+        con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = con.execute("SELECT name, ingredients, instructions, time, one_pot FROM recipes ORDER BY rowid")
+            for name, ingredients, instructions, time, one_pot in rows:
+                yield {"name": name, "ingredients": json.loads(ingredients), "instructions": instructions, "time": time, "one_pot": one_pot}
+        finally:
+            con.close()
+    else:
+        raise ValueError(f"Unsupported recipe catalog format: {path}")
+
+
+def parse_minutes(time):
+    # "45 mins" / "1 hr 10 mins" -> minutes; unknown times sort after everything else
+    hours = re.search(r"(\d+)\s*h", time)
+    mins = re.search(r"(\d+)\s*m", time)
+    if not hours and not mins:
+        return math.inf
+    return (int(hours.group(1)) * 60 if hours else 0) + (int(mins.group(1)) if mins else 0)
+
+
+class Recipe:
+    __slots__ = ("name", "ingredient_ids", "instructions", "time", "minutes", "one_pot")
+
+    def __init__(self, name, ingredient_ids, instructions, time, one_pot):
+        self.name = name
+        self.ingredient_ids = ingredient_ids
+        self.instructions = instructions
+        self.time = time
+        self.minutes = parse_minutes(time)
+        self.one_pot = one_pot
+
+
+POPCOUNT = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8) if np is not None else None
+
+
+class Catalog:
+    """The recipe catalog and the indexes scoring needs; read-only once built.
+
+    Ingredients are numbered by sorted name: `ingredients[i]` is the (interned) name
+    of id i, and each recipe only stores a sorted tuple of ids.
+
+    `lsh_cache` is an optional (path, key) for a sidecar file holding the similarity
+    index; it is loaded from there when the key matches and saved there otherwise.
+    """
+
+    def __init__(self, records, substitutions=SUBSTITUTIONS, lsh_cache=None):
+        rows = []
+        names = set()
+        for rec in records:
+            ingredients = [sys.intern(str(ing)) for ing in rec["ingredients"]]
+            names.update(ingredients)
+            rows.append((rec, ingredients))
+
+        self.ingredients = sorted(names)
+        self.ingredient_ids = {ing: i for i, ing in enumerate(self.ingredients)}
+        self.recipes = [
+            Recipe(
+                rec["name"],
+                tuple(sorted({self.ingredient_ids[ing] for ing in ingredients})),
+                rec["instructions"],
+                rec.get("time") or "--",
+                bool(rec.get("one_pot", False)),
+            )
+            for rec, ingredients in rows
+        ]
+
+        # INGREDIENT INDEX: ingredient id -> ids (positions in `recipes`) of every recipe that uses it
+        self.postings = [array("I") for _ in self.ingredients]
+        for recipe_id, r in enumerate(self.recipes):
+            for ing_id in r.ingredient_ids:
+                self.postings[ing_id].append(recipe_id)
+
+        # SUBSTITUTE INDEX: ingredient id -> ((other id, credit %), ...) over the whole swap
+        # closure, so crediting a fridge's substitutes is one lookup per fridge item
+        closure = substitute_closure(substitutions)
+        self.substitutes = [
+            tuple((self.ingredient_ids[other], credit) for other, credit in sorted(closure.get(ing, {}).items()) if other in self.ingredient_ids)
+            for ing in self.ingredients
+        ]
+
+        # ATTRIBUTE INDEX: masks with one byte per recipe (1 = yes), so filters combine
+        # with whole-int AND instead of a per-recipe scan (see plan_filter)
+        non_vegan_ids = {self.ingredient_ids[ing] for ing in NON_VEGAN_ITEMS if ing in self.ingredient_ids}
+        self.ingredient_counts = array("H", (len(r.ingredient_ids) for r in self.recipes))
+        self.tab_masks = {
+            "vegan": bytes(non_vegan_ids.isdisjoint(r.ingredient_ids) for r in self.recipes),
+            "one_pot": bytes(r.one_pot for r in self.recipes),
+            "simple": bytes(5 <= count <= 6 for count in self.ingredient_counts),
+        }
+        self.allergen_free_masks = {}
+        for group, items in ALLERGEN_GROUPS.items():
+            group_ids = {self.ingredient_ids[ing] for ing in items if ing in self.ingredient_ids}
+            self.allergen_free_masks[group] = bytes(group_ids.isdisjoint(r.ingredient_ids) for r in self.recipes)
+
+        # SIMILARITY INDEX: MinHash / LSH buckets (see lsh), so "more like this" only compares a few candidates
+        self.lsh_cache = lsh_cache
+        self.similar = lru_cache(maxsize=4096)(self._similar)
+
+        # Recipe ids sorted by cooking time, for "under N minutes"
+        self.ids_by_minutes = array("I", sorted(range(len(self.recipes)), key=lambda i: self.recipes[i].minutes))
+        self.sorted_minutes = [self.recipes[i].minutes for i in self.ids_by_minutes]
+        self.minutes_mask = lru_cache(maxsize=64)(self._minutes_mask)
+
+        # Per-recipe columns for the numpy engine; minutes_rank orders recipes by
+        # (minutes, recipe_id), the tail of a ranking key. The bit matrix is built on first use.
+        if np is not None:
+            self.recipe_sizes = np.array([len(r.ingredient_ids) for r in self.recipes], dtype=np.int64)
+            self.recipe_minutes = np.array([r.minutes for r in self.recipes], dtype=np.float64)
+            self.minutes_rank = np.empty(len(self.recipes), dtype=np.int64)
+            self.minutes_rank[np.frombuffer(self.ids_by_minutes, dtype=np.uint32)] = np.arange(len(self.recipes))
+
+    @cached_property
+    def recipe_bits(self):
+        # BIT MATRIX (numpy engine): one packed row per recipe, bit i set when it uses ingredient i.
+        # Dense (recipes x ingredients / 8 bytes), so only built once the numpy engine runs.
+        rows = np.array([recipe_id for recipe_id, r in enumerate(self.recipes) for _ in r.ingredient_ids], dtype=np.int64)
+        cols = np.array([ing_id for r in self.recipes for ing_id in r.ingredient_ids], dtype=np.int64)
+        bits = np.zeros((len(self.recipes), (len(self.ingredients) + 7) // 8), dtype=np.uint8)
+        np.bitwise_or.at(bits, (rows, cols >> 3), (0x80 >> (cols & 7)).astype(np.uint8))
+        return bits
+
+    @cached_property
+    def lsh(self):
+        # Built on the first similar() call, so loads that never need it (CLI workers) skip
+        # hashing every recipe; with lsh_cache, later processes read it from the sidecar
+        if self.lsh_cache is not None:
+            path, key = self.lsh_cache
+            lsh = MinHashLSH.load(path, key, len(self.ingredients))
+            if lsh is not None:
+                return lsh
+        lsh = MinHashLSH([r.ingredient_ids for r in self.recipes], len(self.ingredients))
+        if self.lsh_cache is not None:
+            try:
+                lsh.save(path, key)
+            except OSError:
+                pass  # read-only catalog directory: build it each time instead
+        return lsh
+
+    def _minutes_mask(self, max_minutes):
+        mask = bytearray(len(self.recipes))
+        for i in self.ids_by_minutes[:bisect.bisect_right(self.sorted_minutes, max_minutes)]:
+            mask[i] = 1
+        return bytes(mask)
+
+    def _similar(self, recipe_id, n=4):
+        # Up to n other recipes as ((jaccard, recipe_id), ...), most similar first;
+        # exact Jaccard, but only over (a bounded number of) LSH candidates
+        ingredient_ids = self.recipes[recipe_id].ingredient_ids
+        required = set(ingredient_ids)
+        scored = []
+        for other in self.lsh.candidates(ingredient_ids, limit=256):
+            if other != recipe_id:
+                other_ids = self.recipes[other].ingredient_ids
+                shared = len(required.intersection(other_ids))
+                scored.append((-shared / (len(required) + len(other_ids) - shared), other))
+        return tuple((-jaccard, other) for jaccard, other in heapq.nsmallest(n, scored))
+
+    def credits(self, fridge):
+        # Fridge names -> {ingredient id: credit %}: 100 for what's in it, else the best swap
+        credits = {}
+        for ing in fridge:
+            ing_id = self.ingredient_ids.get(ing)
+            if ing_id is None:
+                continue
+            credits[ing_id] = 100
+            for other, credit in self.substitutes[ing_id]:
+                if credits.get(other, 0) < credit:
+                    credits[other] = credit
+        return credits
+
+    def names(self, ingredient_ids):
+        return {self.ingredients[i] for i in ingredient_ids}
+
+    def pack(self, ingredient_ids):
+        # Ingredient ids -> one packed bit vector, same layout as a bit matrix row
+        bits = np.zeros((len(self.ingredients) + 7) // 8, dtype=np.uint8)
+        for i in ingredient_ids:
+            bits[i >> 3] |= 0x80 >> (i & 7)
+        return bits
+
+
+def open_catalog(path=DEFAULT_CATALOG_PATH):
+    # The similarity index is cached next to the catalog file, keyed by its mtime and size
+    stat = os.stat(path)
+    return Catalog(read_recipe_records(path), lsh_cache=(path + ".lsh", [stat.st_mtime_ns, stat.st_size]))
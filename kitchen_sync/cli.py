@@ -0,0 +1,134 @@
+"""Batch scoring: one JSON fridge per input line in, one JSON result per line out.
+
+    python -m kitchen_sync fridges.jsonl > results.jsonl
+
+Input lines look like {"id": "u1", "fridge": ["eggs", "cheese"], "filters": {"tab": "vegan"}};
+"fridge" may also be the comma separated text a user would type and "filters"
+takes the fields of kitchen_sync.Filters. Output keeps the input order; a line
+that can't be scored gets {"id": ..., "error": "..."} instead of a result.
+"""
+import os
+import sys
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .catalog import ALLERGEN_GROUPS, DEFAULT_CATALOG_PATH, open_catalog
+from .matching import TABS, Filters, match
+from .resolver import IngredientResolver, parse_fridge
+
+# Per-worker state, loaded once by _init_worker
+_catalog = None
+_resolver = None
+
+
+def _init_worker(catalog_path):
+    global _catalog, _resolver
+    _catalog = open_catalog(catalog_path)
+    _resolver = IngredientResolver(_catalog.ingredients)
+
+
+def read_filters(fields):
+    # Input "filters" -> Filters, or ValueError naming what's wrong
+    if not isinstance(fields, dict):
+        raise ValueError("filters must be an object")
+    unknown = set(fields) - set(Filters._fields)
+    if unknown:
+        raise ValueError(f"unknown filters: {', '.join(sorted(unknown))}")
+    filters = Filters(**fields)
+    if filters.tab not in TABS:
+        raise ValueError(f"unknown tab {filters.tab!r}, expected one of: {', '.join(TABS)}")
+    if filters.max_minutes is not None and (isinstance(filters.max_minutes, bool) or not isinstance(filters.max_minutes, (int, float))):
+        raise ValueError("max_minutes must be a number")
+    if isinstance(filters.excluded_allergens, str) or not isinstance(filters.excluded_allergens, (list, tuple)):
+        raise ValueError("excluded_allergens must be a list")
+    unknown = [group for group in filters.excluded_allergens if group not in ALLERGEN_GROUPS]
+    if unknown:
+        raise ValueError(f"unknown allergen groups: {', '.join(map(str, unknown))}")
+    return filters._replace(excluded_allergens=tuple(filters.excluded_allergens))
+
+
+def read_fridge(fridge):
+    if isinstance(fridge, str):
+        return parse_fridge(fridge, _resolver)[0]
+    if not isinstance(fridge, list) or not all(isinstance(item, str) for item in fridge):
+        raise ValueError("fridge must be a string or a list of strings")
+    return {_resolver.resolve(item.strip().lower()) for item in fridge} - {None}
+
+
+def score_line(line, top):
+    # One bad line becomes an error record instead of failing the whole batch
+    request_id = None
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("each line must be a JSON object")
+        request_id = request.get("id")
+        fridge = read_fridge(request.get("fridge", []))
+        filters = read_filters(request.get("filters", {}))
+        total, results = match(_catalog, fridge, filters, limit=top)
+    except Exception as e:
+        return json.dumps({"id": request_id, "error": f"{type(e).__name__}: {e}"}, ensure_ascii=False) + "\n"
+
+    return json.dumps({
+        "id": request_id,
+        "total": total,
+        "results": [
+            {
+                "name": r.recipe.name,
+                "match_percent": r.match_percent,
+                "matching": sorted(r.matching_items),
+                "missing": sorted(r.missing_items),
+                "substitutes": r.substitutes,
+            }
+            for r in results
+        ],
+    }, ensure_ascii=False) + "\n"
+
+
+def score_batch(lines, top):
+    return "".join(score_line(line, top) for line in lines)
+
+
+def read_batches(f, batch_size):
+    batch = []
+    for line in f:
+        if line.strip():
+            batch.append(line)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m kitchen_sync", description="Score a JSONL file of fridges against the recipe catalog.")
+    parser.add_argument("input", help="JSONL file of fridges, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="where to write JSONL results (default: stdout)")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH, help="recipe catalog (.jsonl, .parquet or SQLite)")
+    parser.add_argument("--top", type=int, default=10, help="results kept per fridge (default: 10)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=500, help="fridges sent to a worker at a time (default: 500)")
+    args = parser.parse_args(argv)
+
+    infile = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    outfile = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.catalog,)) as pool:
+            # Bounded window of batches in flight: results stream out in input
+            # order and memory stays flat however long the input is.
+            pending = deque()
+            for batch in read_batches(infile, args.batch_size):
+                pending.append(pool.submit(score_batch, batch, args.top))
+                if len(pending) >= 2 * args.workers:
+                    outfile.write(pending.popleft().result())
+            while pending:
+                outfile.write(pending.popleft().result())
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    return 0
@@ -0,0 +1,342 @@
+"""Scoring a fridge against the catalog, filtering and ranking the matches."""
+import heapq
+import bisect
+from collections import namedtuple
+
+from .catalog import POPCOUNT, np
+
+# "numpy" scores the whole catalog with the bit matrix, "index" walks the posting lists
+SCORING_ENGINE = "numpy" if np is not None else "index"
+
+TABS = ("all", "vegan", "one_pot", "simple")
+
+# What to show: a tab, the "Cook Now" switch, a time limit and allergen groups to leave out
+Filters = namedtuple("Filters", ["tab", "only_full_match", "max_minutes", "excluded_allergens"], defaults=("all", False, None, ()))
+
+# One shown recipe; matching_items / missing_items are ingredient names and
+# substitutes maps a missing item to the fridge item partly standing in for it
+MatchResult = namedtuple("MatchResult", ["recipe_id", "recipe", "match_percent", "matching_items", "missing_items", "substitutes"])
+
+# The best `limit` results plus how many recipes passed the filters in total
+Matches = namedtuple("Matches", ["total", "results"])
+
+# A scored match is its ranking key: (-match_percent, missing count, minutes, recipe_id).
+# Plain tuples sort best-first and are cheap to cache; result details are only
+# worked out for the matches that are actually returned.
+#
+# Each required ingredient earns its credit from Catalog.credits (100 when it is in
+# the fridge, less through a swap); match_percent is the average credit and the
+# missing count is what still lacks full credit. A recipe is only a candidate once
+# it has at least one full-credit ingredient: swaps alone never make a match.
+
+# Per-recipe tallies pack both sums into one int: credit % above FULL_BITS,
+# the count of full-credit ingredients below (recipes have < 1024 ingredients)
+FULL_BITS = 10
+FULL_MASK = (1 << FULL_BITS) - 1
+
+
+def credit_step(credit):
+    return credit << FULL_BITS | (credit == 100)
+
+
+def find_matches(catalog, fridge, only_full_match):
+    matches = []
+
+    # Only visit recipes that share at least one (possibly swapped) item with the fridge:
+    # walking the posting lists tallies each recipe's credits.
+    overlaps = {}
+    for ing_id, credit in catalog.credits(fridge).items():
+        step = credit_step(credit)
+        for recipe_id in catalog.postings[ing_id]:
+            overlaps[recipe_id] = overlaps.get(recipe_id, 0) + step
+
+    for recipe_id, overlap in overlaps.items():
+        if not overlap & FULL_MASK:
+            continue
+        recipe = catalog.recipes[recipe_id]
+        required_count = len(recipe.ingredient_ids)
+        match_percent = (overlap >> FULL_BITS) // required_count
+
+        # GLOBAL FILTER
+        if only_full_match and match_percent < 100:
+            continue
+
+        matches.append((-match_percent, required_count - (overlap & FULL_MASK), recipe.minutes, recipe_id))
+    return matches
+
+
+def find_matches_numpy(catalog, fridge, only_full_match):
+    # Same results as find_matches, scored for the whole catalog at once: one popcount
+    # pass per credit level. Only the bytes holding fridge bits can overlap, so gather
+    # just those columns.
+    levels = {}
+    for ing_id, credit in catalog.credits(fridge).items():
+        levels.setdefault(credit, []).append(ing_id)
+
+    credit_sums = np.zeros(len(catalog.recipes), dtype=np.int64)
+    full_counts = np.zeros(len(catalog.recipes), dtype=np.int64)
+    for credit, ing_ids in levels.items():
+        level_bits = catalog.pack(ing_ids)
+        byte_cols = np.flatnonzero(level_bits)
+        counts = POPCOUNT[catalog.recipe_bits[:, byte_cols] & level_bits[byte_cols]].sum(axis=1, dtype=np.int64)
+        credit_sums += credit * counts
+        if credit == 100:
+            full_counts = counts
+    match_percent = credit_sums // catalog.recipe_sizes
+
+    keep = full_counts > 0
+    if only_full_match:
+        keep &= match_percent >= 100
+
+    recipe_ids = np.flatnonzero(keep)
+    return ScoreArrays(catalog, recipe_ids, match_percent[recipe_ids], catalog.recipe_sizes[recipe_ids] - full_counts[recipe_ids])
+
+
+class ScoreArrays:
+    """The numpy engine's ranking keys as parallel arrays, one row per candidate.
+
+    Iterating yields the same tuples find_matches returns; match() filters and
+    picks its top K on the arrays and only builds tuples for the rows it returns.
+    """
+
+    def __init__(self, catalog, recipe_ids, match_percent, missing):
+        self.catalog = catalog
+        self.recipe_ids = recipe_ids
+        self.match_percent = match_percent
+        self.missing = missing
+
+    def __len__(self):
+        return len(self.recipe_ids)
+
+    def __iter__(self):
+        return zip(
+            (-self.match_percent).tolist(),
+            self.missing.tolist(),
+            self.catalog.recipe_minutes[self.recipe_ids].tolist(),
+            self.recipe_ids.tolist(),
+        )
+
+    def where(self, keep):
+        # The rows where the boolean array `keep` is set
+        return ScoreArrays(self.catalog, self.recipe_ids[keep], self.match_percent[keep], self.missing[keep])
+
+    def select(self, mask):
+        # The rows whose recipe passes a plan_filter mask
+        return self.where(np.frombuffer(mask, dtype=np.bool_)[self.recipe_ids])
+
+    def smallest(self, limit=None):
+        # The best `limit` rows (all of them when None) as ranking keys, best first.
+        # One int per row sorts like the key: 100 - percent, then missing, then the
+        # catalog's (minutes, recipe_id) rank
+        order = (100 - self.match_percent) << 42 | self.missing << 32 | self.catalog.minutes_rank[self.recipe_ids]
+        if limit is not None and limit < len(order):
+            if limit <= 0:
+                return []
+            rows = np.argpartition(order, limit - 1)[:limit]
+            rows = rows[np.argsort(order[rows])]
+        else:
+            rows = np.argsort(order)
+        return list(self.where(rows))
+
+
+def score(catalog, fridge, only_full_match=False, engine=None):
+    # Every recipe sharing at least one ingredient with the fridge, as unsorted ranking keys:
+    # a list of tuples, or ScoreArrays (which iterates as the same tuples) from the numpy engine.
+    # Unknown fridge items are ignored.
+    fridge = frozenset(ing for ing in fridge if ing in catalog.ingredient_ids)
+    if (engine or SCORING_ENGINE) == "numpy":
+        return find_matches_numpy(catalog, fridge, only_full_match)
+    return find_matches(catalog, fridge, only_full_match)
+
+
+class RankedView:
+    """The candidates passing one set of filters, ranked, kept current through edits.
+
+    `keys` holds every candidate in the view. `top` is the sorted list of every key
+    no worse than `floor`, so a page is a slice of it; an edit moves one key in or
+    out, and `top` is only refilled from `keys` when a page needs more than it holds.
+    """
+
+    def __init__(self, mask, only_full_match, candidates):
+        self.mask = mask
+        self.only_full_match = only_full_match
+        self.keys = {recipe_id: key for recipe_id, key in candidates.items() if mask is None or mask[recipe_id]}
+        self.top = []
+        self.floor = None  # None: `top` not filled yet
+
+    def set(self, recipe_id, key):
+        # New ranking key for a recipe passing the mask; None drops it from the view
+        if key is not None and self.only_full_match and key[0] > -100:
+            key = None
+        old = self.keys.pop(recipe_id, None)
+        if self.floor is not None and old is not None and old <= self.floor:
+            del self.top[bisect.bisect_left(self.top, old)]
+        if key is not None:
+            self.keys[recipe_id] = key
+            if self.floor is not None and key <= self.floor:
+                bisect.insort(self.top, key)
+
+    def page(self, limit=None):
+        # The best `limit` keys (all of them when None), best first
+        if limit is None:
+            return sorted(self.keys.values())
+        if self.floor is None or (len(self.top) < limit and len(self.top) < len(self.keys)):
+            # Twice the page, so a few edits that push keys out don't refill it at once
+            self.top = heapq.nsmallest(2 * limit, self.keys.values())
+            self.floor = self.top[-1] if self.top else None
+        return self.top[:limit]
+
+
+class IncrementalScorer:
+    """Scores for one fridge that is edited a few items at a time.
+
+    Keeps each candidate recipe's credit tally and ranking key; update() applies
+    only the posting lists of the ingredients whose credit changed since the last
+    call, so one edit costs time proportional to those ingredients' popularity.
+    Each filtered view match() has been asked for is kept ranked the same way, so
+    a page of it is read without re-ranking the candidates.
+    """
+
+    # Ranked views kept at once, least recently used dropped first
+    MAX_VIEWS = 16
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.fridge = frozenset()
+        self.credits = {}   # ingredient id -> credit % for the current fridge
+        self.overlaps = {}  # recipe_id -> packed credit tally (> 0), as in find_matches
+        self.keys = {}      # recipe_id -> ranking key, every candidate (>= 1 full-credit item)
+        self.full = {}      # recipe_id -> ranking key, 100% matches only
+        self.views = {}     # (tab, only_full_match, max_minutes, excluded_allergens) -> RankedView
+
+    def update(self, fridge):
+        fridge = frozenset(ing for ing in fridge if ing in self.catalog.ingredient_ids)
+        if fridge == self.fridge:
+            return
+        credits = self.catalog.credits(fridge)
+        for ing_id in credits.keys() | self.credits.keys():
+            old, new = self.credits.get(ing_id, 0), credits.get(ing_id, 0)
+            if old != new:
+                self._apply(ing_id, credit_step(new) - credit_step(old))
+        self.fridge = fridge
+        self.credits = credits
+
+    def _apply(self, ing_id, delta):
+        catalog = self.catalog
+        views = list(self.views.values())
+        for recipe_id in catalog.postings[ing_id]:
+            overlap = self.overlaps.get(recipe_id, 0) + delta
+            if not overlap & FULL_MASK:
+                # Swap credit alone: keep the tally but drop the recipe from the candidates
+                if overlap:
+                    self.overlaps[recipe_id] = overlap
+                else:
+                    del self.overlaps[recipe_id]
+                self.keys.pop(recipe_id, None)
+                self.full.pop(recipe_id, None)
+                key = None
+            else:
+                recipe = catalog.recipes[recipe_id]
+                required_count = len(recipe.ingredient_ids)
+                match_percent = (overlap >> FULL_BITS) // required_count
+                key = (-match_percent, required_count - (overlap & FULL_MASK), recipe.minutes, recipe_id)
+                self.overlaps[recipe_id] = overlap
+                self.keys[recipe_id] = key
+                if match_percent >= 100:
+                    self.full[recipe_id] = key
+                else:
+                    self.full.pop(recipe_id, None)
+
+            for view in views:
+                if view.mask is None or view.mask[recipe_id]:
+                    view.set(recipe_id, key)
+
+    def scores(self, only_full_match=False):
+        # Same ranking keys score() returns for the current fridge
+        return list((self.full if only_full_match else self.keys).values())
+
+    def match(self, filters=Filters(), limit=None):
+        # Same result as match(catalog, fridge, filters, limit), read from a ranked view
+        view_key = (filters.tab, filters.only_full_match, filters.max_minutes, tuple(filters.excluded_allergens))
+        view = self.views.pop(view_key, None)
+        if view is None:
+            mask = plan_filter(self.catalog, filters.tab, filters.max_minutes, filters.excluded_allergens)
+            view = RankedView(mask, filters.only_full_match, self.full if filters.only_full_match else self.keys)
+        self.views[view_key] = view
+        if len(self.views) > self.MAX_VIEWS:
+            del self.views[next(iter(self.views))]
+        best = view.page(limit)
+        return Matches(len(view.keys), [describe_match(self.catalog, self.fridge, m) for m in best])
+
+
+def plan_filter(catalog, tab="all", max_minutes=None, excluded_allergens=()):
+    # QUERY PLANNER: AND the precomputed masks for a tab + time + allergen query.
+    # Returns None when nothing is filtered, otherwise a mask indexed by recipe id.
+    masks = []
+    if tab != "all":
+        masks.append(catalog.tab_masks[tab])
+    if max_minutes is not None:
+        masks.append(catalog.minutes_mask(max_minutes))
+    masks.extend(catalog.allergen_free_masks[group] for group in excluded_allergens)
+    if not masks:
+        return None
+    if len(masks) == 1:
+        return masks[0]
+
+    # Most selective first, so an empty intersection stops early
+    masks.sort(key=lambda m: m.count(1))
+    combined = int.from_bytes(masks[0], "little")
+    for mask in masks[1:]:
+        if not combined:
+            break
+        combined &= int.from_bytes(mask, "little")
+    return combined.to_bytes(len(catalog.recipes), "little")
+
+
+def find_swaps(catalog, fridge, wanted):
+    # Wanted ingredient name -> (credit %, fridge item) for the best swap the fridge offers
+    swaps = {}
+    for ing in fridge:
+        ing_id = catalog.ingredient_ids.get(ing)
+        if ing_id is None:
+            continue
+        for other, credit in catalog.substitutes[ing_id]:
+            name = catalog.ingredients[other]
+            if name in wanted and credit > swaps.get(name, (0,))[0]:
+                swaps[name] = (credit, ing)
+    return swaps
+
+
+def describe_match(catalog, fridge, match):
+    # Ranking key -> MatchResult; full-credit swaps count as matching
+    recipe = catalog.recipes[match[3]]
+    required_ingredients = catalog.names(recipe.ingredient_ids)
+    matching_items = required_ingredients.intersection(fridge)
+    swaps = find_swaps(catalog, fridge, required_ingredients - matching_items)
+    matching_items.update(ing for ing, (credit, _) in swaps.items() if credit == 100)
+    substitutes = {ing: have for ing, (credit, have) in swaps.items() if credit < 100}
+    return MatchResult(match[3], recipe, -match[0], matching_items, required_ingredients - matching_items, substitutes)
+
+
+def match(catalog, fridge, filters=Filters(), limit=None, scores=None):
+    """Rank the catalog for one fridge (a set of ingredient names).
+
+    Returns Matches(total, results) with the best `limit` results (all of them
+    when limit is None), best match first. Pass `scores` from an earlier
+    score() call with the same fridge and only_full_match to skip scoring.
+    """
+    if scores is None:
+        scores = score(catalog, fridge, filters.only_full_match)
+
+    mask = plan_filter(catalog, filters.tab, filters.max_minutes, filters.excluded_allergens)
+    if isinstance(scores, ScoreArrays):
+        # Vectorised: mask and top-K on the arrays, tuples only for what is returned
+        if mask is not None:
+            scores = scores.select(mask)
+        best = scores.smallest(limit)
+    else:
+        if mask is not None:
+            scores = [m for m in scores if mask[m[3]]]
+        # TOP-K: only rank (and describe) what will be returned
+        best = sorted(scores) if limit is None else heapq.nsmallest(limit, scores)
+    return Matches(len(scores), [describe_match(catalog, fridge, m) for m in best])
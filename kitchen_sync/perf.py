@@ -0,0 +1,51 @@
+"""Per-rerun stage timings, logged as JSON lines. Costs one attribute check per call when off."""
+import json
+import time
+import logging
+
+logger = logging.getLogger("kitchen_sync.perf")
+
+
+def configure_log(path=None):
+    # Send the JSON lines to `path` (or stderr) once per process
+    if logger.handlers:
+        return
+    handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class StageTimer:
+    """Lap timer for one rerun: lap(name) charges the time since the previous lap to `name`."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.stages = {}
+        self.counts = {}
+        self._start = self._last = time.perf_counter() if enabled else 0.0
+
+    def lap(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def count(self, name, value):
+        if self.enabled:
+            self.counts[name] = value
+
+    def record(self, **extra):
+        return {
+            "ts": time.time(),
+            "total_ms": round((self._last - self._start) * 1000, 3),
+            "stages": {name: round(ms, 3) for name, ms in self.stages.items()},
+            "counts": self.counts,
+            **extra,
+        }
+
+    def log(self, **extra):
+        if self.enabled:
+            logger.info(json.dumps(self.record(**extra)))
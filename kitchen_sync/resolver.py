@@ -0,0 +1,114 @@
+"""Typed text -> catalog ingredients."""
+import re
+from functools import lru_cache
+
+# Other names people type for catalog ingredients (keys are already singular)
+INGREDIENT_ALIASES = {
+    "aubergine": "eggplant",
+    "capsicum": "bell pepper",
+    "cheddar": "cheese",
+    "chilli flake": "chili flakes",
+    "courgette": "zucchini",
+    "garbanzo": "chickpeas",
+    "garbanzo bean": "chickpeas",
+    "mince": "ground beef",
+    "noodle": "pasta",
+    "prawn": "shrimp",
+    "spaghetti": "pasta",
+    "stock": "broth",
+    "vegetable stock": "vegetable broth",
+}
+
+
+def singular(name):
+    # Plural -> singular for the last word only ("green beans" -> "green bean")
+    if name.endswith("ies") and len(name) > 4:
+        return name[:-3] + "y"
+    if name.endswith("oes") and len(name) > 4:
+        return name[:-2]
+    if name.endswith("s") and not name.endswith("ss") and len(name) > 3:
+        return name[:-1]
+    return name
+
+
+class IngredientResolver:
+    """Maps a typed item to a catalog ingredient, or None.
+
+    Lookups go exact -> alias / plural -> typed text inside an ingredient
+    (trigram index) -> an ingredient named inside the typed text (word spans),
+    so the cost depends on the typed item, not on the size of the vocabulary.
+    Items of 3 characters or fewer only match an ingredient missing its last
+    letter ("ric" -> "rice"), as the original scan did.
+    """
+
+    def __init__(self, vocabulary, aliases=INGREDIENT_ALIASES, cache_size=4096):
+        self.exact = set(vocabulary)
+
+        # singular form -> ingredient; an ingredient already in singular form wins the key
+        self.normalized = {}
+        for ing in sorted(vocabulary):
+            key = singular(ing)
+            if key == ing or key not in self.normalized:
+                self.normalized[key] = ing
+        for alias, ing in aliases.items():
+            if ing in self.exact:
+                self.normalized.setdefault(alias, ing)
+
+        # name minus its last letter -> ingredient, for short items; alphabetically first wins
+        self.short = {}
+        for ing in sorted(vocabulary):
+            if 1 < len(ing) <= 4:
+                self.short.setdefault(ing[:-1], ing)
+
+        # trigram -> ingredients containing it
+        self.trigrams = {}
+        for ing in vocabulary:
+            for i in range(len(ing) - 2):
+                self.trigrams.setdefault(ing[i:i + 3], set()).add(ing)
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _lookup(self, name):
+        if name in self.exact:
+            return name
+        return self.normalized.get(singular(name))
+
+    def _resolve(self, item):
+        hit = self._lookup(item)
+        if hit is not None:
+            return hit
+        if len(item) <= 3:
+            return self.short.get(item)
+
+        # Typed text inside an ingredient ("parm" -> "parmesan"): every trigram of
+        # the item must occur in the ingredient, then confirm with a real substring test
+        postings = sorted((self.trigrams.get(item[i:i + 3], set()) for i in range(len(item) - 2)), key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        candidates = [ing for ing in candidates if item in ing]
+        if candidates:
+            # Prefer a match at a word start, then the closest length, then alphabetical
+            return min(candidates, key=lambda ing: (not (" " + ing).count(" " + item), len(ing), ing))
+
+        # An ingredient named inside the typed text ("cheddar cheese" -> "cheese"): longest word span wins
+        words = item.split()
+        for size in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - size + 1):
+                hit = self._lookup(" ".join(words[start:start + size]))
+                if hit is not None:
+                    return hit
+        return None
+
+
+def parse_fridge(text, resolver):
+    # Comma / newline separated text -> (fridge set, recognised ingredients in typed order)
+    raw_items = re.split(r'[,\n]', text)
+    cleaned_items = [x.strip().lower() for x in raw_items if x.strip()]
+
+    fridge = set()
+    recognized_items = []
+    for item in cleaned_items:
+        db_item = resolver.resolve(item)
+        if db_item is not None:
+            fridge.add(db_item)
+            recognized_items.append(db_item)
+    return fridge, recognized_items
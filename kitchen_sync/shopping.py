@@ -0,0 +1,114 @@
+"""What to buy next: the few ingredients that turn the most near-matches into 100% matches."""
+import math
+import heapq
+from itertools import chain, combinations, filterfalse, repeat
+from collections import namedtuple
+
+from .matching import ScoreArrays, plan_filter, score
+
+# One pick: the ingredient names bought together and the recipe ids they complete
+Purchase = namedtuple("Purchase", ["ingredients", "unlocked"])
+
+
+def _subsets(bundle):
+    # Every non-empty subset of a small sorted tuple of ingredient ids, as sorted tuples
+    return chain.from_iterable(combinations(bundle, size) for size in range(1, len(bundle) + 1))
+
+
+def _best_group(waiting):
+    # The group completing the most recipes per ingredient bought (its own and those of
+    # every group inside it), ties to the smaller then alphabetically first group.
+    # waiting[size] maps each group of that many ingredients to its recipe ids.
+    #
+    # Summing over all subsets is the expensive part, so each group starts with an upper
+    # bound and only gets its exact gain once that bound reaches the top of the heap
+    # (CELF-style lazy evaluation). A proper subset S of G with two or more ingredients
+    # has at least |S| - 1 of them besides any one ingredient d of G, so sharing own(S)
+    # out as own(S) / (|S| - 1) to each of its ingredients,
+    #   gain(G) <= own(G) + own of G's single ingredients + shares of G's ingredients but d
+    # counting the shares from every smaller group, and d the ingredient of G with the most.
+    # Exact for groups of one or two ingredients.
+    largest = max(size for size, groups in enumerate(waiting) if groups)
+    scale = math.lcm(*range(1, max(largest - 1, 2)))
+    singles = {group[0]: len(recipe_ids) for group, recipe_ids in waiting[1].items()}
+    heap = [(-own, 1, (ing_id,), True) for ing_id, own in singles.items()]
+    if largest > 1:
+        heap += [(-(len(recipe_ids) + singles.get(a, 0) + singles.get(b, 0)) / 2, 2, (a, b), True) for (a, b), recipe_ids in waiting[2].items()]
+    # A bigger group needs a bound better than the best of those exact ones to ever win
+    cutoff = min(heap, default=(0,))[0]
+
+    # Sizes in increasing order, so shares (times `scale`) only come from smaller groups
+    # when a size is bounded
+    shares = {}
+    for size in range(3, largest + 1):
+        share = scale // (size - 2)
+        for group, recipe_ids in waiting[size - 1].items():
+            for ing_id in group:
+                shares[ing_id] = shares.get(ing_id, 0) + len(recipe_ids) * share
+        for group, recipe_ids in waiting[size].items():
+            group_shares = list(map(shares.get, group, repeat(0)))
+            bound = len(recipe_ids) + sum(map(singles.get, group, repeat(0))) - (max(group_shares) - sum(group_shares)) // scale
+            if -bound / size < cutoff:
+                heap.append((-bound / size, size, group, False))
+    heapq.heapify(heap)
+
+    # A bound sorts no later than the group's exact gain would, so the first exact entry
+    # popped is the best group
+    while heap:
+        _, size, group, exact = heapq.heappop(heap)
+        if exact:
+            return group
+        gain = sum(len(waiting[len(subset)].get(subset, ())) for subset in _subsets(group))
+        heapq.heappush(heap, (-gain / size, size, group, True))
+    return None
+
+
+def suggest_purchases(catalog, fridge, budget=3, tab="all", max_minutes=None, excluded_allergens=(), scores=None):
+    """Greedily pick up to `budget` ingredients that complete the most recipes.
+
+    Only near-complete recipes count: ones sharing an item with the fridge and
+    missing at most `budget` ingredients, after the tab / time / allergen filters.
+    Each step buys the still-missing set of some recipe with the best recipes
+    completed per ingredient bought. Returns a list of Purchase in buying order.
+    Pass `scores` from score() (without only_full_match) to skip scoring.
+    """
+    if scores is None:
+        scores = score(catalog, fridge)
+    if isinstance(scores, ScoreArrays):
+        scores = scores.where((scores.missing > 0) & (scores.missing <= budget))
+    mask = plan_filter(catalog, tab, max_minutes, excluded_allergens)
+    have = {ing_id for ing_id, credit in catalog.credits(fridge).items() if credit == 100}
+
+    # Recipes grouped by what still lacks full credit (a sorted tuple of ingredient ids),
+    # kept apart by how many ingredients that is; a recipe is complete once its whole
+    # group is bought
+    waiting = [{} for _ in range(budget + 1)]
+    recipes = catalog.recipes
+    for _, missing_count, _, recipe_id in scores:
+        if 0 < missing_count <= budget and (mask is None or mask[recipe_id]):
+            missing = tuple(filterfalse(have.__contains__, recipes[recipe_id].ingredient_ids))
+            waiting[len(missing)].setdefault(missing, []).append(recipe_id)
+
+    purchases = []
+    while budget > 0 and any(waiting):
+        group = _best_group(waiting)
+        bought = set(group)
+        budget -= len(group)
+
+        # Only the groups overlapping the purchase change: they shrink, or are complete
+        unlocked = []
+        shrunk = {}
+        for groups in waiting:
+            for missing in [missing for missing in groups if not bought.isdisjoint(missing)]:
+                recipe_ids = groups.pop(missing)
+                rest = tuple(filterfalse(bought.__contains__, missing))
+                if rest:
+                    shrunk.setdefault(rest, []).extend(recipe_ids)
+                else:
+                    unlocked.extend(recipe_ids)
+        for rest, recipe_ids in shrunk.items():
+            waiting[len(rest)].setdefault(rest, []).extend(recipe_ids)
+        # A group over the remaining budget can't be bought, nor shrink enough to be later
+        del waiting[budget + 1:]
+        purchases.append(Purchase(sorted(catalog.names(group)), sorted(unlocked)))
+    return purchases
@@ -0,0 +1,100 @@
+"""MinHash signatures and LSH banding over recipe ingredient sets, for "more like this"."""
+import os
+import sys
+import json
+import random
+from array import array
+
+MERSENNE_61 = (1 << 61) - 1
+
+
+class MinHashLSH:
+    """Candidate neighbours by Jaccard similarity without comparing all pairs.
+
+    A recipe's signature is `bands * rows` min-hashes of its ingredient ids; recipes
+    whose signatures agree on every row of some band share a bucket. With 16 bands
+    of 3 rows a pair at Jaccard 0.6 shares a bucket ~98% of the time, at 0.2 ~12%.
+    """
+
+    def __init__(self, ingredient_sets, n_ingredients, bands=16, rows=3, seed=0, buckets=None):
+        rng = random.Random(seed)
+        self.bands = bands
+        self.rows = rows
+        self.seed = seed
+        params = [(rng.randrange(1, MERSENNE_61), rng.randrange(MERSENNE_61)) for _ in range(bands * rows)]
+        # Ingredient id -> its hash under every permutation; a signature is the column-wise min
+        self.hashes = [tuple((a * i + b) % MERSENNE_61 for a, b in params) for i in range(n_ingredients)]
+
+        if buckets is None:
+            buckets = {}
+            for recipe_id, ingredient_ids in enumerate(ingredient_sets):
+                for key in self.band_keys(ingredient_ids):
+                    buckets.setdefault(key, []).append(recipe_id)
+            # A bucket of one never suggests anything, so only shared buckets are kept
+            buckets = {key: array("I", recipe_ids) for key, recipe_ids in buckets.items() if len(recipe_ids) > 1}
+        self.buckets = buckets
+
+    def signature(self, ingredient_ids):
+        return tuple(map(min, zip(*(self.hashes[i] for i in ingredient_ids))))
+
+    def band_keys(self, ingredient_ids):
+        signature = self.signature(ingredient_ids)
+        rows = self.rows
+        return [hash((band, signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def candidates(self, ingredient_ids, limit=None):
+        # Recipes sharing a bucket with this ingredient set, at most `limit` of them.
+        # Small buckets (more specific matches) are taken first.
+        found = set()
+        buckets = [self.buckets[key] for key in self.band_keys(ingredient_ids) if key in self.buckets]
+        for bucket in sorted(buckets, key=len):
+            if limit is not None:
+                if len(found) >= limit:
+                    break
+                bucket = bucket[:limit - len(found)]
+            found.update(bucket)
+        return found
+
+    # SIDECAR FILE: a JSON header line, then the bucket keys, sizes and members as raw
+    # arrays. Building the buckets hashes every recipe; loading them is a few reads.
+
+    def save(self, path, key):
+        # `key` identifies the catalog the buckets were built from (see load)
+        keys = array("q", self.buckets)
+        sizes = array("I", map(len, self.buckets.values()))
+        members = array("I")
+        for bucket in self.buckets.values():
+            members.extend(bucket)
+        header = {"key": key, "bands": self.bands, "rows": self.rows, "seed": self.seed, "n_ingredients": len(self.hashes),
+                  "byteorder": sys.byteorder, "buckets": len(keys), "members": len(members)}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            keys.tofile(f)
+            sizes.tofile(f)
+            members.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, key, n_ingredients, bands=16, rows=3, seed=0):
+        # The saved index, or None when the file is missing or was built for another
+        # catalog (key), parameters or byte order
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                expected = {"key": key, "bands": bands, "rows": rows, "seed": seed, "n_ingredients": n_ingredients, "byteorder": sys.byteorder}
+                if any(header.get(name) != value for name, value in expected.items()):
+                    return None
+                keys, sizes, members = array("q"), array("I"), array("I")
+                keys.fromfile(f, header["buckets"])
+                sizes.fromfile(f, header["buckets"])
+                members.fromfile(f, header["members"])
+        except (OSError, ValueError, EOFError):
+            return None
+
+        buckets = {}
+        start = 0
+        for bucket_key, size in zip(keys, sizes):
+            buckets[bucket_key] = members[start:start + size]
+            start += size
+        return cls((), n_ingredients, bands, rows, seed, buckets=buckets)
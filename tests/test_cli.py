@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from kitchen_sync import DEFAULT_CATALOG_PATH, cli
+
+
+@pytest.fixture(scope="module", autouse=True)
+def worker():
+    cli._init_worker(DEFAULT_CATALOG_PATH)
+
+
+def test_scores_a_line():
+    out = json.loads(cli.score_line('{"id": "u1", "fridge": "eggs, cheese, butter", "filters": {"max_minutes": 30}}', top=3))
+    assert out["id"] == "u1"
+    assert out["total"] > 0 and len(out["results"]) == 3
+    assert "lsh" not in vars(cli._catalog)  # workers never build the similarity index
+
+
+@pytest.mark.parametrize("line, message", [
+    ('{"id": "u1", "filters": {"tab": "Vegan"}}', "unknown tab"),
+    ('{"id": "u1", "filters": {"excluded_allergens": ["Wheat"]}}', "unknown allergen groups"),
+    ('{"id": "u1", "filters": {"colour": "red"}}', "unknown filters"),
+    ('{"id": "u1", "fridge": [1, 2]}', "fridge must be"),
+    ('{"id": "u1", "filters": {"max_minutes": "30"}}', "max_minutes"),
+])
+def test_bad_line_becomes_error_record(line, message):
+    out = json.loads(cli.score_line(line, top=3))
+    assert out["id"] == "u1" and message in out["error"]
+
+
+def test_bad_json_becomes_error_record():
+    out = json.loads(cli.score_line("not json", top=3))
+    assert out["id"] is None and "JSONDecodeError" in out["error"]
@@ -0,0 +1,176 @@
+import random
+
+import pytest
+
+from benchmarks.synthetic import make_catalog
+from kitchen_sync import ALLERGEN_GROUPS, DEFAULT_CATALOG_PATH, TABS, Catalog, Filters, IncrementalScorer, match, open_catalog, parse_minutes, plan_filter, score
+from kitchen_sync.catalog import NON_VEGAN_ITEMS, np, read_recipe_records
+
+
+@pytest.fixture(scope="module", params=["bundled", "synthetic"])
+def catalog(request):
+    if request.param == "bundled":
+        return open_catalog()
+    return Catalog(make_catalog(2000, 300, seed=7))
+
+
+def random_fridges(catalog, n, seed):
+    rng = random.Random(seed)
+    return [set(rng.sample(catalog.ingredients, rng.randint(1, 15))) for _ in range(n)]
+
+
+def baseline_match(records, fridge, filter_mode, only_full_match):
+    # The original app's full scan, ties broken as the ranking key does
+    matches = []
+    for recipe_id, recipe in enumerate(records):
+        required_ingredients = set(recipe["ingredients"])
+        matching_items = fridge.intersection(required_ingredients)
+        missing_items = required_ingredients - fridge
+        match_percent = int((len(matching_items) / len(required_ingredients)) * 100)
+        if only_full_match and match_percent < 100:
+            continue
+        if filter_mode == "vegan":
+            if not required_ingredients.isdisjoint(NON_VEGAN_ITEMS):
+                continue
+        elif filter_mode == "simple":
+            if not (5 <= len(required_ingredients) <= 6):
+                continue
+        elif filter_mode == "one_pot":
+            if not recipe.get("one_pot", False):
+                continue
+        if len(matching_items) >= 1:
+            matches.append((recipe_id, match_percent, matching_items, missing_items))
+    matches.sort(key=lambda m: (-m[1], len(m[3]), parse_minutes(records[m[0]].get("time") or "--"), m[0]))
+    return matches
+
+
+ENGINES = ["index"] + (["numpy"] if np is not None else [])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("source", ["bundled", "synthetic"])
+def test_match_agrees_with_baseline_scan(source, engine):
+    records = list(read_recipe_records(DEFAULT_CATALOG_PATH)) if source == "bundled" else make_catalog(2000, 300, seed=11)
+    catalog = Catalog(records, substitutions=[])
+    rng = random.Random(4)
+    for fridge in random_fridges(catalog, 200, seed=5):
+        fridge.add("not an ingredient")
+        filter_mode = rng.choice(TABS)
+        only_full_match = rng.random() < 0.3
+        expected = baseline_match(records, fridge, filter_mode, only_full_match)
+        scores = score(catalog, fridge, only_full_match, engine=engine)
+        total, results = match(catalog, fridge, Filters(filter_mode, only_full_match), scores=scores)
+        assert total == len(expected)
+        assert [(r.recipe_id, r.match_percent, r.matching_items, r.missing_items) for r in results] == expected
+
+
+@pytest.mark.skipif(np is None, reason="numpy engine not available")
+@pytest.mark.parametrize("only_full_match", [False, True])
+def test_numpy_engine_matches_index_engine(catalog, only_full_match):
+    for fridge in random_fridges(catalog, 100, seed=1):
+        expected = sorted(score(catalog, fridge, only_full_match, engine="index"))
+        assert sorted(score(catalog, fridge, only_full_match, engine="numpy")) == expected
+
+
+@pytest.mark.skipif(np is None, reason="numpy engine not available")
+def test_vectorised_match_matches_tuple_match(catalog):
+    rng = random.Random(8)
+    for fridge in random_fridges(catalog, 100, seed=9):
+        filters = Filters(
+            rng.choice(TABS),
+            rng.random() < 0.3,
+            rng.choice([None, 10, 30, 60]),
+            tuple(rng.sample(sorted(ALLERGEN_GROUPS), rng.randint(0, 2))),
+        )
+        limit = rng.choice([None, 0, 1, 5, 20])
+        arrays = score(catalog, fridge, filters.only_full_match, engine="numpy")
+        assert match(catalog, fridge, filters, limit, scores=arrays) == match(catalog, fridge, filters, limit, scores=list(arrays))
+
+
+def test_incremental_scorer_matches_score(catalog):
+    rng = random.Random(2)
+    popular = sorted(catalog.ingredients, key=lambda ing: -len(catalog.postings[catalog.ingredient_ids[ing]]))[:100]
+    scorer = IncrementalScorer(catalog)
+    fridge = set()
+    for _ in range(200):
+        if fridge and rng.random() < 0.45:
+            fridge.discard(rng.choice(sorted(fridge)))
+        else:
+            fridge.add(rng.choice(popular))
+        scorer.update(fridge)
+        assert sorted(scorer.scores()) == sorted(score(catalog, fridge, engine="index"))
+        assert sorted(scorer.scores(True)) == sorted(score(catalog, fridge, True, engine="index"))
+
+
+def test_swaps_alone_do_not_make_a_match(catalog):
+    for fridge in random_fridges(catalog, 50, seed=3) + [{"eggs", "cheese", "tomato"}]:
+        for item in match(catalog, fridge).results:
+            assert item.matching_items
+
+
+def test_swap_only_recipe_is_not_listed():
+    catalog = open_catalog()
+    names = [item.recipe.name for item in match(catalog, {"eggs", "cheese", "tomato"}).results]
+    assert not [name for name in names if name.startswith("Pesto Pasta")]
+
+
+def filter_predicate(catalog, recipe, tab, max_minutes, excluded_allergens):
+    names = catalog.names(recipe.ingredient_ids)
+    if tab == "vegan" and not names.isdisjoint(NON_VEGAN_ITEMS):
+        return False
+    if tab == "one_pot" and not recipe.one_pot:
+        return False
+    if tab == "simple" and not 5 <= len(names) <= 6:
+        return False
+    if max_minutes is not None and recipe.minutes > max_minutes:
+        return False
+    return all(names.isdisjoint(ALLERGEN_GROUPS[group]) for group in excluded_allergens)
+
+
+def test_plan_filter_matches_predicate():
+    records = make_catalog(3000, 300, seed=9)
+    records += [{"name": "Untimed", "ingredients": ["eggs", "butter"], "instructions": "", "time": "--", "one_pot": True}]
+    catalog = Catalog(records)
+    rng = random.Random(6)
+    queries = [
+        ("all", None, ()),
+        ("vegan", 1, ("Dairy",)),                       # nothing is that quick: empty intersection
+        ("one_pot", 0, ("Eggs", "Nuts", "Soy")),
+        ("simple", 10_000, ()),                          # longer than every recipe
+        ("all", 10_000, tuple(ALLERGEN_GROUPS)),
+        ("vegan", None, ("Dairy", "Eggs")),              # vegan already excludes these
+    ]
+    for _ in range(200):
+        queries.append((
+            rng.choice(TABS),
+            rng.choice([None, 1, 5, 12, 20, 30, 45, 60, 90, 10_000]),
+            tuple(rng.sample(sorted(ALLERGEN_GROUPS), rng.randint(0, 3))),
+        ))
+    for tab, max_minutes, excluded_allergens in queries:
+        mask = plan_filter(catalog, tab, max_minutes, excluded_allergens)
+        expected = [filter_predicate(catalog, recipe, tab, max_minutes, excluded_allergens) for recipe in catalog.recipes]
+        if mask is None:
+            assert all(expected)
+        else:
+            assert len(mask) == len(catalog.recipes)
+            assert [bool(flag) for flag in mask] == expected
+
+
+def test_incremental_views_match_match(catalog):
+    rng = random.Random(10)
+    popular = sorted(catalog.ingredients, key=lambda ing: -len(catalog.postings[catalog.ingredient_ids[ing]]))[:60]
+    views = [Filters(tab, only_full_match) for tab in TABS for only_full_match in (False, True)]
+    views += [Filters("vegan", False, 30, ("Nuts",)), Filters("all", False, 15, ("Dairy", "Eggs"))]
+    scorer = IncrementalScorer(catalog)
+    scorer.MAX_VIEWS = 6  # some views get dropped and rebuilt along the way
+    fridge = set()
+    for _ in range(150):
+        if fridge and rng.random() < 0.45:
+            fridge.discard(rng.choice(sorted(fridge)))
+        else:
+            fridge.add(rng.choice(popular))
+        scorer.update(fridge)
+        for filters in rng.sample(views, 4):
+            limit = rng.choice([None, 1, 5, 20, 40])
+            expected = match(catalog, fridge, filters, limit, scores=score(catalog, fridge, filters.only_full_match, engine="index"))
+            assert scorer.match(filters, limit) == expected
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from kitchen_sync import IngredientResolver, open_catalog, parse_fridge
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    return open_catalog().ingredients
+
+
+@pytest.fixture(scope="module")
+def resolver(vocabulary):
+    return IngredientResolver(vocabulary)
+
+
+@pytest.mark.parametrize("item, expected", [
+    # exact
+    ("eggs", "eggs"),
+    ("green beans", "green beans"),
+    ("tomato", "tomato"),
+    # plural / singular
+    ("egg", "eggs"),
+    ("tomatoes", "tomato"),
+    ("sweet potatoes", "sweet potato"),
+    ("potato", "potatoes"),
+    ("olive", "olives"),
+    ("carrot", "carrot"),
+    ("carrots", "carrots"),
+    # aliases
+    ("aubergine", "eggplant"),
+    ("courgettes", "zucchini"),
+    ("prawns", "shrimp"),
+    ("spaghetti", "pasta"),
+    ("cheddar", "cheese"),
+    # typed text inside an ingredient (trigrams)
+    ("parm", "parmesan"),
+    ("mozz", "mozzarella"),
+    # an ingredient inside the typed text (word spans)
+    ("cheddar cheese", "cheese"),
+    ("red onion", "onion"),
+    # 3 characters or fewer: exact, or one letter short
+    ("oil", "oil"),
+    ("ric", "rice"),
+    ("pea", "peas"),
+    ("mil", "milk"),
+    ("ri", None),
+    ("tea", None),
+    ("xyz", None),
+    ("berries", None),
+])
+def test_resolve(resolver, item, expected):
+    assert resolver.resolve(item) == expected
+
+
+def baseline_short(item, vocabulary):
+    # The original scan for items of 3 characters or fewer
+    if item in vocabulary:
+        return item
+    for db_item in sorted(vocabulary):
+        if item == db_item[:-1]:
+            return db_item
+    return None
+
+
+def test_short_items_resolve_as_before(resolver, vocabulary):
+    items = {ing[:size] for ing in vocabulary for size in (1, 2, 3)}
+    for item in items:
+        assert resolver.resolve(item) == baseline_short(item, vocabulary)
+
+
+def test_results_do_not_depend_on_vocabulary_order(resolver, vocabulary):
+    typed = [ing[:n] for ing in vocabulary for n in (3, 4, 6)] + [ing + "s" for ing in vocabulary]
+    typed += ["tomatoes", "cheddar cheese", "red onion", "sweet potatoes", "aubergine"]
+    expected = [resolver.resolve(item) for item in typed]
+    rng = random.Random(0)
+    for _ in range(5):
+        shuffled = list(vocabulary)
+        rng.shuffle(shuffled)
+        assert [IngredientResolver(shuffled).resolve(item) for item in typed] == expected
+
+
+def test_parse_fridge(resolver):
+    fridge, recognized = parse_fridge("Eggs, parm\n tomatoes ,, unicorn", resolver)
+    assert fridge == {"eggs", "parmesan", "tomato"}
+    assert recognized == ["eggs", "parmesan", "tomato"]
@@ -0,0 +1,61 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from benchmarks.synthetic import make_catalog
+from kitchen_sync import Catalog, score, suggest_purchases
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return Catalog(make_catalog(3000, 300, seed=3))
+
+
+def from_scratch(catalog, fridge, budget):
+    # The same greedy, re-scoring every group at every step
+    have = {ing_id for ing_id, credit in catalog.credits(fridge).items() if credit == 100}
+    waiting = {}
+    for _, missing_count, _, recipe_id in score(catalog, fridge):
+        if 0 < missing_count <= budget:
+            waiting.setdefault(frozenset(catalog.recipes[recipe_id].ingredient_ids) - have, []).append(recipe_id)
+    picks = []
+    while budget > 0:
+        best = None
+        for group in waiting:
+            if len(group) > budget:
+                continue
+            gain = sum(len(waiting.get(frozenset(s), ())) for n in range(1, len(group) + 1) for s in combinations(group, n))
+            key = (-gain / len(group), len(group), tuple(sorted(group)))
+            if best is None or key < best[0]:
+                best = (key, group)
+        if best is None:
+            break
+        group = best[1]
+        unlocked, rest = [], {}
+        for missing, recipe_ids in waiting.items():
+            if missing <= group:
+                unlocked.extend(recipe_ids)
+            else:
+                rest.setdefault(missing - group, []).extend(recipe_ids)
+        waiting = rest
+        budget -= len(group)
+        picks.append((sorted(catalog.names(group)), sorted(unlocked)))
+    return picks
+
+
+def test_greedy_matches_from_scratch(catalog):
+    rng = random.Random(1)
+    popular = sorted(catalog.ingredients, key=lambda ing: -len(catalog.postings[catalog.ingredient_ids[ing]]))[:80]
+    for _ in range(60):
+        fridge = set(rng.sample(popular, rng.randint(3, 20)))
+        budget = rng.randint(1, 5)
+        purchases = suggest_purchases(catalog, fridge, budget)
+        assert [tuple(p) for p in purchases] == from_scratch(catalog, fridge, budget)
+
+        # Everything reported as unlocked really is a full match after the purchases
+        bought = set(fridge)
+        for purchase in purchases:
+            bought.update(purchase.ingredients)
+            full = {m[3] for m in score(catalog, bought, only_full_match=True)}
+            assert set(purchase.unlocked) <= full
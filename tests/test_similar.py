@@ -0,0 +1,45 @@
+import os
+import json
+
+import pytest
+
+from benchmarks.synthetic import make_catalog
+from kitchen_sync import open_catalog
+from kitchen_sync.similar import MinHashLSH
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = tmp_path / "recipes.jsonl"
+    path.write_text("".join(json.dumps(rec) + "\n" for rec in make_catalog(2000, 300, seed=5)), encoding="utf-8")
+    return str(path)
+
+
+def test_index_is_built_on_first_similar_call(catalog_path):
+    catalog = open_catalog(catalog_path)
+    assert "lsh" not in vars(catalog) and not os.path.exists(catalog_path + ".lsh")
+    catalog.similar(0)
+    assert "lsh" in vars(catalog) and os.path.exists(catalog_path + ".lsh")
+
+
+def test_sidecar_gives_the_same_index(catalog_path):
+    built = open_catalog(catalog_path)
+    expected = [built.similar(recipe_id) for recipe_id in range(0, 2000, 37)]
+
+    loaded = open_catalog(catalog_path)
+    assert loaded.lsh.buckets == built.lsh.buckets
+    assert [loaded.similar(recipe_id) for recipe_id in range(0, 2000, 37)] == expected
+
+
+def test_stale_sidecar_is_rebuilt(catalog_path):
+    old = open_catalog(catalog_path)
+    old.similar(0)
+    first = old.recipes[0]
+    with open(catalog_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"name": "Copy", "ingredients": old.names(first.ingredient_ids), "instructions": "", "time": "5 mins"}, default=sorted) + "\n")
+    stat = os.stat(catalog_path)
+    assert MinHashLSH.load(catalog_path + ".lsh", [stat.st_mtime_ns, stat.st_size], len(old.ingredients)) is None
+
+    catalog = open_catalog(catalog_path)
+    assert 2000 in catalog.lsh.candidates(first.ingredient_ids)
+    assert catalog.lsh.buckets == MinHashLSH([r.ingredient_ids for r in catalog.recipes], len(catalog.ingredients)).buckets